@@ -0,0 +1,106 @@
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gale_shapley.utils import load_data, create_applicant_preferences, create_university_quotas
+from gale_shapley.algorithm import gale_shapley_matching
+from gale_shapley.outofcore import build_store, outofcore_matching
+
+UNIVERSITIES = {'S1': ['Q1', 'Q2', 'Q3'], 'S2': ['Q1', 'Q2']}
+
+
+def generate_instance(directory, num_applicants, seed=0):
+    """
+    Write a synthetic applicants/universities CSV pair in the sample data layout.
+    
+    Returns:
+        Tuple of (applicants_file, universities_file)
+    """
+    rnd = random.Random(seed)
+    applicants_file = os.path.join(directory, 'applicants.csv')
+    universities_file = os.path.join(directory, 'universities.csv')
+    
+    with open(universities_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['university_id', 'Q1_quota', 'Q2_quota', 'Q3_quota'])
+        for univ_id, quotas in UNIVERSITIES.items():
+            writer.writerow([univ_id] + [max(1, num_applicants // 10) if f"Q{k}" in quotas else 0 for k in (1, 2, 3)])
+    
+    columns = ['applicant_id']
+    for univ_id, quotas in UNIVERSITIES.items():
+        columns += [f"{univ_id}_priority", f"{univ_id}_Kvalifisert?", f"{univ_id}_guaranteed"]
+        columns += [f"{univ_id}_{quota}_eligible" for quota in quotas]
+        columns += [f"{univ_id}_{quota}_points" for quota in quotas]
+    
+    with open(applicants_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for i in range(num_applicants):
+            priorities = rnd.sample([1, 2], 2)
+            row = {'applicant_id': f"A{i}"}
+            for (univ_id, quotas), priority in zip(UNIVERSITIES.items(), priorities):
+                row[f"{univ_id}_priority"] = priority
+                row[f"{univ_id}_Kvalifisert?"] = 'Ja' if rnd.random() < 0.9 else 'Nei'
+                row[f"{univ_id}_guaranteed"] = 'No'
+                for quota in quotas:
+                    row[f"{univ_id}_{quota}_eligible"] = 'Yes' if rnd.random() < 0.8 else 'No'
+                    row[f"{univ_id}_{quota}_points"] = rnd.randint(0, 70)
+            writer.writerow(row)
+    
+    return applicants_file, universities_file
+
+
+def main():
+    """
+    Compare the throughput of the out-of-core engine with the in-memory engine.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark out-of-core vs in-memory matching.')
+    parser.add_argument('--applicants', type=int, default=200000,
+                        help='Number of synthetic applicants')
+    parser.add_argument('--memory-budget', type=int, default=64,
+                        help='Out-of-core memory budget in MB')
+    parser.add_argument('--skip-in-memory', action='store_true',
+                        help='Only run the out-of-core engine')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        applicants_file, universities_file = generate_instance(tmp, args.applicants)
+        
+        start = time.perf_counter()
+        meta = build_store(applicants_file, universities_file, os.path.join(tmp, 'store'))
+        built = time.perf_counter()
+        ooc_result = outofcore_matching(os.path.join(tmp, 'store'), args.memory_budget * 1024 * 1024)
+        matched = time.perf_counter()
+        
+        pairs = meta['num_pairs']
+        print(f"{args.applicants} applicants, {pairs} applicant-quota pairs")
+        print(f"Out-of-core: build {built - start:.2f}s, match {matched - built:.2f}s, "
+              f"{pairs / (matched - start):.0f} pairs/s")
+        
+        if args.skip_in_memory:
+            return 0
+        
+        start = time.perf_counter()
+        raw_applicants, raw_universities = load_data(applicants_file, universities_file)
+        gs_applicants = create_applicant_preferences(raw_applicants)
+        university_quotas = create_university_quotas(raw_applicants, raw_universities)
+        built = time.perf_counter()
+        in_memory_result = gale_shapley_matching(gs_applicants, university_quotas)
+        matched = time.perf_counter()
+        
+        print(f"In-memory:   build {built - start:.2f}s, match {matched - built:.2f}s, "
+              f"{pairs / (matched - start):.0f} pairs/s")
+        
+        same = all(set(ooc_result[q]) == set(students) for q, students in in_memory_result.items())
+        print(f"Results identical: {same}")
+    
+    return 0
+
+if __name__ == "__main__":
+    main()
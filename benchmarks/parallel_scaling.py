@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gale_shapley.models import Applicant, UniversityQuota
+from gale_shapley.registry import IdRegistry
+from gale_shapley.algorithm import gale_shapley_matching
+from gale_shapley.parallel import parallel_gale_shapley_matching
+
+
+def generate_entities(num_applicants, num_quotas, choices, seed=0):
+    """
+    Build random applicants and quotas with tight capacities to force long rejection chains.
+    
+    Returns:
+        Function returning fresh (applicants, university_quotas) dictionaries
+    """
+    rnd = random.Random(seed)
+    quota_ids = [f"U{j % 50}_Q{j}" for j in range(num_quotas)]
+    preferences = {f"A{i}": rnd.sample(quota_ids, choices) for i in range(num_applicants)}
+    
+    rankings = {quota_id: [] for quota_id in quota_ids}
+    for app_id, prefs in preferences.items():
+        for quota_id in prefs:
+            rankings[quota_id].append(app_id)
+    for ranking in rankings.values():
+        rnd.shuffle(ranking)
+    
+    capacity = max(1, int(0.8 * num_applicants / num_quotas))
+    
+    def build():
+        applicants = {app_id: Applicant(app_id, prefs) for app_id, prefs in preferences.items()}
+        university_quotas = {q: UniversityQuota(q, capacity, rankings[q]) for q in quota_ids}
+        return applicants, university_quotas
+    
+    return build
+
+
+def main():
+    """
+    Compare the sequential engine with the round-synchronous engine at several worker counts.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the round-synchronous parallel engine.')
+    parser.add_argument('--applicants', type=int, default=200000,
+                        help='Number of synthetic applicants')
+    parser.add_argument('--quotas', type=int, default=500,
+                        help='Number of synthetic quotas')
+    parser.add_argument('--choices', type=int, default=8,
+                        help='Preferences per applicant')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1],
+                        help='Worker counts to run')
+    args = parser.parse_args()
+    
+    build = generate_entities(args.applicants, args.quotas, args.choices)
+    print(f"{args.applicants} applicants, {args.quotas} quotas, {os.cpu_count()} CPUs")
+    
+    applicants, university_quotas = build()
+    registry = IdRegistry.from_entities(applicants, university_quotas)
+    start = time.perf_counter()
+    expected = gale_shapley_matching(applicants, university_quotas, registry)
+    print(f"sequential: {time.perf_counter() - start:.2f}s")
+    expected = {q: set(s) for q, s in expected.items()}
+    
+    for workers in sorted(set(args.workers)):
+        applicants, university_quotas = build()
+        start = time.perf_counter()
+        result = parallel_gale_shapley_matching(applicants, university_quotas, registry, workers=workers)
+        elapsed = time.perf_counter() - start
+        same = {q: set(s) for q, s in result.items()} == expected
+        print(f"parallel, {workers} workers: {elapsed:.2f}s (identical: {same})")
+    
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import gc
+import io
+import os
+import sys
+import time
+import tarfile
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from gale_shapley.utils import (
+    load_data,
+    create_applicant_preferences,
+    create_university_quotas,
+    handle_guaranteed_students
+)
+from gale_shapley.algorithm import gale_shapley_matching
+from gale_shapley.formatters import format_results_markdown
+from gale_shapley.instance import MatchingInstance
+from gale_shapley.utils import compute_cutoffs
+from outofcore_throughput import generate_instance
+
+
+def load_baseline(ref, directory):
+    """
+    Import the gale_shapley package as it was at a git ref, under another name.
+    """
+    archive = subprocess.run(['git', 'archive', ref, 'gale_shapley'], cwd=REPO_ROOT,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+
+    package_dir = os.path.join(directory, 'gale_shapley')
+    spec = importlib.util.spec_from_file_location('baseline_gale_shapley', os.path.join(package_dir, '__init__.py'),
+                                                  submodule_search_locations=[package_dir])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def timed(timings, stage, function, *args):
+    """
+    Run one stage and add its time to the timings.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+    return result
+
+
+def match(gs_applicants, university_quotas):
+    # Every variant uses the current engine, so only the stage code differs
+    return gale_shapley_matching(gs_applicants, university_quotas)
+
+
+def baseline_stages(baseline, raw_applicants, raw_universities, timings):
+    """
+    The stage code of the baseline commit, reading the raw dictionaries.
+    """
+    utils = baseline.utils
+    gs_applicants = timed(timings, 'preferences', utils.create_applicant_preferences, raw_applicants)
+    university_quotas = timed(timings, 'quotas', utils.create_university_quotas, raw_applicants, raw_universities)
+    matching = timed(timings, 'matching', match, gs_applicants, university_quotas)
+    matching = timed(timings, 'guarantees', utils.handle_guaranteed_students,
+                     matching, raw_applicants, gs_applicants, university_quotas)
+    return timed(timings, 'report', baseline.formatters.format_results_markdown,
+                 matching, gs_applicants, university_quotas, raw_applicants)
+
+
+def compatibility_stages(raw_applicants, raw_universities, timings):
+    """
+    The current stage functions called with raw dictionaries; each one compiles its own instance.
+    """
+    gs_applicants = timed(timings, 'preferences', create_applicant_preferences, raw_applicants)
+    university_quotas = timed(timings, 'quotas', create_university_quotas, raw_applicants, raw_universities)
+    matching = timed(timings, 'matching', match, gs_applicants, university_quotas)
+    matching = timed(timings, 'guarantees', handle_guaranteed_students,
+                     matching, raw_applicants, gs_applicants, university_quotas)
+    timed(timings, 'cutoffs', compute_cutoffs, matching, university_quotas, raw_applicants)
+    return timed(timings, 'report', format_results_markdown,
+                 matching, gs_applicants, university_quotas, raw_applicants)
+
+
+def compiled_stages(raw_applicants, raw_universities, timings):
+    """
+    Compile the instance once and hand it to every stage.
+    """
+    instance = timed(timings, 'compile', MatchingInstance, raw_applicants, raw_universities)
+    registry = instance.registry
+    gs_applicants = timed(timings, 'preferences', instance.applicant_preferences)
+    university_quotas = timed(timings, 'quotas', instance.university_quotas)
+    matching = timed(timings, 'matching', match, gs_applicants, university_quotas)
+    matching = timed(timings, 'guarantees', handle_guaranteed_students,
+                     matching, instance, gs_applicants, university_quotas, registry)
+    timed(timings, 'cutoffs', compute_cutoffs, matching, university_quotas, instance)
+    return timed(timings, 'report', format_results_markdown,
+                 matching, gs_applicants, university_quotas, instance, registry)
+
+
+def main():
+    """
+    Compare the stage code of the baseline commit, the raw-dict compatibility path and the compiled instance.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark baseline stages against the compiled pipeline.')
+    parser.add_argument('--applicants', type=int, default=100000,
+                        help='Number of synthetic applicants')
+    parser.add_argument('--baseline', type=str, default='7066a36',
+                        help='Git ref of the baseline stage code')
+    parser.add_argument('--guaranteed', type=float, default=0.0,
+                        help='Share of applicants with a guarantee for each university')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = load_baseline(args.baseline, tmp)
+        raw_applicants, raw_universities = load_data(*generate_instance(tmp, args.applicants))
+
+    # Give some applicants guarantees so the guarantee stage does real work
+    step = max(1, round(1 / args.guaranteed)) if args.guaranteed else 0
+    for i, row in enumerate(raw_applicants.values()):
+        if step and i % step == 0:
+            row['S1_guaranteed'] = row['S2_guaranteed'] = 'Yes'
+
+    variants = (
+        (f"baseline {args.baseline}", lambda timings: baseline_stages(baseline, raw_applicants, raw_universities, timings)),
+        ('raw-dict compatibility', lambda timings: compatibility_stages(raw_applicants, raw_universities, timings)),
+        ('compiled instance', lambda timings: compiled_stages(raw_applicants, raw_universities, timings))
+    )
+
+    print(f"{args.applicants} applicants (matching uses the current engine in every variant)")
+    reports = {}
+    for name, run in variants:
+        # Start every variant without the previous one's garbage
+        gc.collect()
+        timings = {}
+        reports[name] = run(timings)
+        stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+        other = sum(seconds for stage, seconds in timings.items() if stage != 'matching')
+        print(f"{name}: {sum(timings.values()):.2f}s, {other:.2f}s outside matching ({stages})")
+
+    print(f"Reports identical: {len(set(reports.values())) == 1}")
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gale_shapley.utils import load_data
+from gale_shapley.service import WarmInstance, MatchingService, ServiceClient
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def worker(client, method, path, payload, count, latencies):
+    for _ in range(count):
+        start = time.perf_counter()
+        status, _ = await client.request(method, path, payload)
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f"{method} {path} returned {status}")
+
+
+async def run(args):
+    server = None
+    
+    # Without an address, load the instance and serve it from this process
+    if args.port is None and args.socket is None:
+        raw_applicants, raw_universities = load_data(args.applicants, args.universities)
+        server = await MatchingService(WarmInstance(raw_applicants, raw_universities)).start(port=0)
+        host, port = server.sockets[0].getsockname()[:2]
+    else:
+        host, port = args.host, args.port
+    
+    payload = None
+    method = 'GET'
+    if args.endpoint == '/preview':
+        method = 'POST'
+        payload = {'applicants': {args.preview_applicant: {args.preview_field: args.preview_value}}}
+    
+    clients = [await ServiceClient.connect(host, port, args.socket) for _ in range(args.concurrency)]
+    per_client = max(1, args.requests // args.concurrency)
+    latencies = []
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(c, method, args.endpoint, payload, per_client, latencies) for c in clients))
+    elapsed = time.perf_counter() - start
+    
+    for client in clients:
+        await client.close()
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+    
+    latencies.sort()
+    print(f"{method} {args.endpoint}: {len(latencies)} requests, concurrency {args.concurrency}")
+    print(f"Throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"p50: {percentile(latencies, 0.50) * 1000:.3f} ms")
+    print(f"p99: {percentile(latencies, 0.99) * 1000:.3f} ms")
+
+
+def main():
+    """
+    Load-test a matching service and report p50/p99 latency.
+    """
+    parser = argparse.ArgumentParser(description='Load-test the matching service.')
+    parser.add_argument('--applicants', type=str, default='data/input/applicants.csv',
+                        help='Applicants CSV for the in-process service')
+    parser.add_argument('--universities', type=str, default='data/input/universities.csv',
+                        help='Universities CSV for the in-process service')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Host of a running service')
+    parser.add_argument('--port', type=int, default=None,
+                        help='Port of a running service (starts one in-process if omitted)')
+    parser.add_argument('--socket', type=str, default=None,
+                        help='Unix socket of a running service')
+    parser.add_argument('--endpoint', type=str, default='/match',
+                        choices=['/match', '/cutoffs', '/preview', '/health'],
+                        help='Endpoint to load')
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Total number of requests')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='Number of concurrent connections')
+    parser.add_argument('--preview-applicant', type=str, default='Curie',
+                        help='Applicant changed in /preview requests')
+    parser.add_argument('--preview-field', type=str, default='S1_Q3_points',
+                        help='Field changed in /preview requests')
+    parser.add_argument('--preview-value', type=str, default='99',
+                        help='Value used in /preview requests')
+    
+    asyncio.run(run(parser.parse_args()))
+    return 0
+
+if __name__ == "__main__":
+    main()
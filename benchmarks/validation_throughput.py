@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gale_shapley.utils import load_data
+from gale_shapley.validation import preflight
+from outofcore_throughput import generate_instance
+
+
+def main():
+    """
+    Compare the preflight validation pass with plain loading of the same files.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark preflight validation against load_data.')
+    parser.add_argument('--applicants', type=int, default=1000000,
+                        help='Number of synthetic applicants')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        applicants_file, universities_file = generate_instance(tmp, args.applicants)
+        
+        start = time.perf_counter()
+        loaded = load_data(applicants_file, universities_file)
+        load_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        checked = preflight(applicants_file, universities_file)
+        preflight_time = time.perf_counter() - start
+    
+    print(f"{args.applicants} applicants")
+    print(f"load_data: {load_time:.2f}s")
+    print(f"preflight: {preflight_time:.2f}s ({checked.errors} errors, {checked.warnings} warnings)")
+    print(f"Same data: {(checked.raw_applicants, checked.raw_universities) == loaded}")
+    return 0
+
+if __name__ == "__main__":
+    main()
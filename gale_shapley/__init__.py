@@ -1,21 +1,49 @@
-from .algorithm import gale_shapley_matching
-from .models import Applicant, UniversityQuota
-from .utils import (
-    load_data, 
-    create_applicant_preferences, 
-    create_university_quotas, 
-    handle_guaranteed_students
-)
-from .formatters import format_results_markdown, save_results
+# Public name -> submodule defining it. Submodules are imported on first
+# access, so a run only pays for the engines and I/O it actually uses.
+_EXPORTS = {
+    'gale_shapley_matching': 'algorithm',
+    'parallel_gale_shapley_matching': 'parallel',
+    'distributed_gale_shapley_matching': 'distributed',
+    'Applicant': 'models',
+    'UniversityQuota': 'models',
+    'IdRegistry': 'registry',
+    'load_data': 'utils',
+    'create_applicant_preferences': 'utils',
+    'create_university_quotas': 'utils',
+    'handle_guaranteed_students': 'utils',
+    'compute_cutoffs': 'utils',
+    'preflight': 'validation',
+    'ValidationIssue': 'validation',
+    'MatchingInstance': 'instance',
+    'run_pipeline': 'pipeline',
+    'PipelineResult': 'pipeline',
+    'ScoringEngine': 'scoring',
+    'load_formulas': 'scoring',
+    'format_results_markdown': 'formatters',
+    'save_results': 'formatters',
+    'compute_statistics': 'statistics',
+    'statistics_json': 'statistics',
+    'format_statistics_markdown': 'statistics',
+    'AdmissionRounds': 'rounds',
+    'build_store': 'outofcore',
+    'outofcore_matching': 'outofcore',
+    'ResultCache': 'cache',
+    'instance_key': 'cache',
+    'WarmInstance': 'service',
+    'MatchingService': 'service',
+    'serve': 'service'
+}
 
-__all__ = [
-    'gale_shapley_matching',
-    'Applicant',
-    'UniversityQuota',
-    'load_data',
-    'create_applicant_preferences',
-    'create_university_quotas',
-    'handle_guaranteed_students',
-    'format_results_markdown',
-    'save_results'
-]
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
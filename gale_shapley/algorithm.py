@@ -1,49 +1,168 @@
-def gale_shapley_matching(applicants, university_quotas):
+import heapq
+from collections import deque
+from .registry import IdRegistry
+
+def unranked_rank(ranked_count, a):
+    """
+    Rank of an applicant missing from a quota's ranking.
+
+    Unranked applicants come after everyone in the ranking and are ordered
+    among themselves by applicant index, so every engine breaks these ties
+    the same way.
+
+    Args:
+        ranked_count: Length of the quota's ranking
+        a: Applicant index
+
+    Returns:
+        The rank
+    """
+    return ranked_count + a
+
+def encode_instance(applicants, university_quotas, registry, from_start=False):
+    """
+    Translate applicants and quotas into integer-indexed arrays.
+
+    Args:
+        applicants: Dictionary of Applicant objects keyed by ID
+        university_quotas: Dictionary of UniversityQuota objects keyed by ID
+        registry: IdRegistry covering all applicants and quotas
+        from_start: Encode the full preference lists, including quotas already proposed to
+
+    Returns:
+        Tuple of (preferences, pair_ranks, capacities) where preferences[a] lists the
+        quota indexes applicant a still has to propose to, pair_ranks[a][k] is the rank
+        applicant a holds in the quota preferences[a][k], and capacities[q] is the size of quota q
+    """
+    applicant_index = registry.applicant_index
+    quota_index = registry.quota_index
+
+    preferences = [[] for _ in registry.applicants]
+    pair_ranks = [[] for _ in registry.applicants]
+    for app_id, applicant in applicants.items():
+        a = applicant_index[app_id]
+        # Only the preferences the applicant has not proposed to yet
+        start = 0 if from_start else applicant.next_to_propose
+        prefs = [quota_index[quota_id] for quota_id in applicant.preferences[start:]]
+        preferences[a] = prefs
+        pair_ranks[a] = [None] * len(prefs)
+
+    # Fill in ranks straight from the quota rankings; preference lists are short to search
+    capacities = [0] * len(registry.quotas)
+    ranked_counts = [0] * len(registry.quotas)
+    for quota_id, univ_quota in university_quotas.items():
+        q = quota_index[quota_id]
+        capacities[q] = univ_quota.quota
+        ranked_counts[q] = len(univ_quota.preferences)
+        for rank, app_id in enumerate(univ_quota.preferences):
+            a = applicant_index.get(app_id)
+            if a is None:
+                continue
+            prefs = preferences[a]
+            if q in prefs:
+                pair_ranks[a][prefs.index(q)] = rank
+
+    # Quotas that do not rank an applicant still order them, after everyone ranked
+    for a, ranks in enumerate(pair_ranks):
+        for k, rank in enumerate(ranks):
+            if rank is None:
+                ranks[k] = unranked_rank(ranked_counts[preferences[a][k]], a)
+
+    return preferences, pair_ranks, capacities
+
+def gale_shapley_matching(applicants, university_quotas, registry=None):
     """
     Implements the Gale-Shapley algorithm for stable matching.
-    
+
+    Applicants and quotas are translated to dense integer indexes before the
+    proposal loop runs, and translated back to IDs only for the result.
+    Applicants a quota does not rank can still take its spare places; they
+    rank below everyone ranked, in applicant order (see unranked_rank).
+
     Args:
         applicants: Dictionary of Applicant objects keyed by ID
         university_quotas: Dictionary of UniversityQuota objects keyed by ID
-        
+        registry: Optional IdRegistry; built from the entities if not given
+
     Returns:
         Dictionary mapping university quota IDs to lists of applicant IDs
     """
+    if registry is None:
+        registry = IdRegistry.from_entities(applicants, university_quotas)
+
+    preferences, pair_ranks, capacities = encode_instance(applicants, university_quotas, registry)
+    applicant_index = registry.applicant_index
+    quota_index = registry.quota_index
+
+    # Holders of each quota as a max-heap on rank
+    holders = [[] for _ in registry.quotas]
+    next_to_propose = [0] * len(registry.applicants)
+    current_match = [None] * len(registry.applicants)
+    sequence = 0
+
+    # Keep anyone already matched by an earlier run
+    for quota_id, univ_quota in university_quotas.items():
+        if not univ_quota.current_matches:
+            continue
+        q = quota_index[quota_id]
+        held = set(univ_quota.current_matches)
+        ranks = {app_id: rank for rank, app_id in enumerate(univ_quota.preferences) if app_id in held}
+        for app_id in univ_quota.current_matches:
+            a = applicant_index[app_id]
+            rank = ranks.get(app_id)
+            if rank is None:
+                rank = unranked_rank(len(univ_quota.preferences), a)
+            heapq.heappush(holders[q], (-rank, sequence, a))
+            current_match[a] = q
+            sequence += 1
+
     # Create a queue of free applicants
-    free_applicants = list(applicants.keys())
-    
+    free_applicants = deque(applicant_index[app_id] for app_id in applicants)
+
     # Continue until there are no free applicants left or all have exhausted preferences
     while free_applicants:
-        applicant_id = free_applicants.pop(0)
-        applicant = applicants[applicant_id]
-        
-        # Get next university quota to propose to
-        university_quota_id = applicant.get_next_preference()
-        
+        a = free_applicants.popleft()
+
         # If applicant has exhausted preferences, continue to next applicant
-        if university_quota_id is None:
+        k = next_to_propose[a]
+        if k >= len(preferences[a]):
+            continue
+        next_to_propose[a] = k + 1
+
+        q = preferences[a][k]
+        rank = pair_ranks[a][k]
+        quota_holders = holders[q]
+
+        # If quota is not filled, accept the applicant
+        if len(quota_holders) < capacities[q]:
+            heapq.heappush(quota_holders, (-rank, sequence, a))
+            current_match[a] = q
+            sequence += 1
             continue
-        
-        university_quota = university_quotas[university_quota_id]
-        
-        # Try to match applicant with university quota
-        rejected_id = university_quota.add_applicant(applicant_id)
-        
-        if rejected_id is None or rejected_id != applicant_id:
-            # Applicant was accepted
-            applicant.current_match = university_quota_id
-            
-            # If another applicant was rejected, add them back to free applicants
-            if rejected_id is not None and rejected_id != applicant_id:
-                applicants[rejected_id].current_match = None
-                free_applicants.append(rejected_id)
+
+        # Replace the least preferred holder if the applicant ranks higher
+        if quota_holders and rank < -quota_holders[0][0]:
+            _, _, rejected = heapq.heapreplace(quota_holders, (-rank, sequence, a))
+            current_match[a] = q
+            current_match[rejected] = None
+            sequence += 1
+            free_applicants.append(rejected)
         else:
             # Applicant was rejected, put back in the queue
-            free_applicants.append(applicant_id)
-    
-    # Build the final matching result
+            free_applicants.append(a)
+
+    # Write the state back to the entities and build the final matching result
+    for app_id, applicant in applicants.items():
+        a = applicant_index[app_id]
+        applicant.next_to_propose += next_to_propose[a]
+        q = current_match[a]
+        applicant.current_match = registry.quotas[q] if q is not None else None
+
     result = {}
     for univ_quota_id, univ_quota in university_quotas.items():
+        # Acceptance order matches the order matches were appended in
+        ordered = sorted(holders[quota_index[univ_quota_id]], key=lambda holder: holder[1])
+        univ_quota.current_matches = [registry.applicants[holder[2]] for holder in ordered]
         result[univ_quota_id] = univ_quota.current_matches.copy()
-    
-    return result
\ No newline at end of file
+
+    return result
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+# Bump when the layout of cached entries or the pipeline output changes
+CACHE_VERSION = 4
+
+
+def _raw(value):
+    """
+    Convert a raw CSV value to JSON exactly as loaded.
+    """
+    if value is None or isinstance(value, (int, list)):
+        return value
+    return str(value)
+
+
+def instance_key(raw_applicants, raw_universities, options=None):
+    """
+    Compute a content hash of the raw inputs and algorithm options.
+
+    Values are hashed exactly as loaded, since the matching compares them
+    exactly (e.g., "Yes " is not eligible). Applicant order is part of the
+    key, since ties in points are broken by input order; the order of the
+    applicant columns is not.
+
+    Args:
+        raw_applicants: Dictionary of raw applicant data from CSV
+        raw_universities: Dictionary of raw university data from CSV
+        options: Dictionary of options that affect the result
+
+    Returns:
+        Hex digest identifying the instance
+    """
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps({'version': CACHE_VERSION, 'options': options or {}}, sort_keys=True).encode())
+
+    # Hash row by row so large inputs are never serialized as a whole
+    for app_id, app_data in raw_applicants.items():
+        row = sorted([str(key), _raw(value)] for key, value in app_data.items())
+        hasher.update(json.dumps([str(app_id), row]).encode())
+
+    hasher.update(b'\x00universities')
+    for univ_id, univ_data in raw_universities.items():
+        row = [[str(key), _raw(value)] for key, value in univ_data.items()]
+        hasher.update(json.dumps([str(univ_id), row]).encode())
+
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded on-disk cache of matching results with LRU eviction.
+
+    Each entry is a JSON file named by its instance key. The file modification
+    time records the last use, so eviction removes the least recently used
+    entries first.
+    """
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory holding the cache entries
+            max_bytes: Maximum total size of the cache entries in bytes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    @staticmethod
+    def _touch(path):
+        """
+        Mark an entry as most recently used.
+        """
+        # Set an explicit timestamp since some filesystems only keep coarse mtimes
+        now = time.time_ns()
+        try:
+            os.utime(path, ns=(now, now))
+        except OSError:
+            pass
+
+    def get(self, key):
+        """
+        Look up a cached entry.
+
+        Args:
+            key: Instance key from instance_key
+
+        Returns:
+            The cached entry dictionary or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self._touch(path)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Store an entry and evict least recently used entries over the size bound.
+
+        Args:
+            key: Instance key from instance_key
+            entry: JSON-serializable dictionary to store
+        """
+        # Write atomically so concurrent runs never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
+        self._touch(self._path(key))
+
+        self._evict()
+
+    def _evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Get the hit, miss and eviction counters for this cache object.
+
+        Returns:
+            Dictionary of counters
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
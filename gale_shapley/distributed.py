@@ -0,0 +1,280 @@
+import json
+import socket
+import argparse
+import multiprocessing
+from .algorithm import encode_instance
+from .parallel import resolve_proposals
+from .registry import IdRegistry
+
+def _send(stream, message):
+    """
+    Write one newline-delimited JSON message.
+    """
+    stream.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+    stream.flush()
+
+def _receive(stream):
+    """
+    Read one newline-delimited JSON message.
+    """
+    line = stream.readline()
+    if not line:
+        raise ConnectionError('Connection closed by peer')
+    return json.loads(line)
+
+class MatchingWorker:
+    """
+    Worker state for one partition of applicants and quotas.
+
+    Applicant a is owned by worker a % workers and quota q by worker q % workers.
+    Applicant owners turn rejections into proposals to the next choice; quota
+    owners resolve proposals against their holders and answer with rejections.
+    """
+    def __init__(self, worker, workers, applicants, capacities):
+        """
+        Initialize the worker.
+
+        Args:
+            worker: Index of this worker
+            workers: Total number of workers
+            applicants: Dictionary mapping owned applicant indexes to [quota indexes, ranks]
+            capacities: List of quota capacities by quota index
+        """
+        self.worker = worker
+        self.workers = workers
+        self.applicants = applicants
+        self.capacities = capacities
+        self.next_to_propose = {a: 0 for a in applicants}
+        self.holders = {}
+
+    def _propose(self, a, outbox):
+        """
+        Send applicant a's next proposal, if any choices are left.
+        """
+        preferences, ranks = self.applicants[a]
+        k = self.next_to_propose[a]
+        if k >= len(preferences):
+            return
+        self.next_to_propose[a] = k + 1
+        q = preferences[k]
+        outbox[q % self.workers]['proposals'].append([q, ranks[k], a])
+
+    def step(self, proposals, rejections, start=False):
+        """
+        Process one batch of incoming messages.
+
+        Args:
+            proposals: List of [quota index, rank, applicant index] for owned quotas
+            rejections: List of rejected owned applicant indexes
+            start: Whether this is the first step, where every owned applicant proposes
+
+        Returns:
+            List indexed by destination worker of {'proposals': [...], 'rejections': [...]}
+        """
+        outbox = [{'proposals': [], 'rejections': []} for _ in range(self.workers)]
+
+        for a in (self.applicants if start else rejections):
+            self._propose(a, outbox)
+
+        rejected = resolve_proposals([tuple(proposal) for proposal in proposals], self.holders, self.capacities)
+        for a in rejected:
+            outbox[a % self.workers]['rejections'].append(a)
+
+        return outbox
+
+    def collect(self):
+        """
+        Get the final state of the owned quotas and applicants.
+
+        Returns:
+            Tuple of (dictionary mapping quota indexes to applicant indexes, best ranked first,
+            dictionary mapping applicant indexes to the number of proposals made)
+        """
+        holders = {q: [a for _, a in quota_holders] for q, quota_holders in self.holders.items()}
+        return holders, self.next_to_propose
+
+def serve_worker(host='127.0.0.1', port=0, ready=None):
+    """
+    Run a matching worker that serves one coordinator connection.
+
+    Each worker handles a single run: it accepts one connection, answers its
+    messages until the coordinator sends stop or disconnects, and then exits.
+    Start a new worker for every run. Messages that need worker state before
+    init are answered with an error message.
+
+    Args:
+        host: Host to bind
+        port: Port to bind; 0 picks a free port
+        ready: Optional connection to send the bound port to once listening
+    """
+    with socket.create_server((host, port)) as server:
+        if ready is not None:
+            ready.send(server.getsockname()[1])
+            ready.close()
+
+        connection, _ = server.accept()
+        with connection, connection.makefile('rwb') as stream:
+            worker = None
+            while True:
+                message = _receive(stream)
+                kind = message['type']
+
+                if kind == 'init':
+                    applicants = {int(a): entry for a, entry in message['applicants'].items()}
+                    worker = MatchingWorker(message['worker'], message['workers'], applicants,
+                                            message['capacities'])
+                    _send(stream, {'type': 'ready'})
+                elif kind in ('step', 'collect') and worker is None:
+                    _send(stream, {'type': 'error', 'error': f"Received {kind} before init"})
+                elif kind == 'step':
+                    outbox = worker.step(message['proposals'], message['rejections'], message.get('start', False))
+                    _send(stream, {'type': 'outbox', 'outbox': outbox})
+                elif kind == 'collect':
+                    holders, next_to_propose = worker.collect()
+                    _send(stream, {'type': 'state', 'holders': holders, 'next_to_propose': next_to_propose})
+                elif kind == 'stop':
+                    break
+                else:
+                    _send(stream, {'type': 'error', 'error': f"Unknown message type {kind}"})
+
+def spawn_local_workers(count):
+    """
+    Start worker processes listening on free local ports.
+
+    Returns:
+        Tuple of (list of (host, port) addresses, list of processes)
+    """
+    context = multiprocessing.get_context()
+    addresses = []
+    processes = []
+
+    for _ in range(count):
+        parent_end, child_end = context.Pipe()
+        process = context.Process(target=serve_worker, args=('127.0.0.1', 0, child_end), daemon=True)
+        process.start()
+        child_end.close()
+        addresses.append(('127.0.0.1', parent_end.recv()))
+        parent_end.close()
+        processes.append(process)
+
+    return addresses, processes
+
+def distributed_gale_shapley_matching(applicants, university_quotas, addresses=None, workers=2, registry=None):
+    """
+    Gale-Shapley matching across worker processes that may live on other hosts.
+
+    Applicants and quotas are partitioned across the workers. The coordinator
+    runs the computation in supersteps: it delivers every worker's batch of
+    proposals and rejections, gathers the batches they send, and routes them
+    to their owners for the next superstep. Termination is detected when a
+    superstep produces no messages at all. Deferred acceptance does not
+    depend on proposal order, so the matching equals the single-process
+    applicant-optimal result.
+
+    Args:
+        applicants: Dictionary of Applicant objects keyed by ID
+        university_quotas: Dictionary of UniversityQuota objects keyed by ID
+        addresses: List of (host, port) of running workers; local workers are spawned if not given
+        workers: Number of local workers to spawn when no addresses are given
+        registry: Optional IdRegistry; built from the entities if not given
+
+    Returns:
+        Dictionary mapping university quota IDs to lists of applicant IDs, best ranked first
+    """
+    if registry is None:
+        registry = IdRegistry.from_entities(applicants, university_quotas)
+
+    preferences, pair_ranks, capacities = encode_instance(applicants, university_quotas, registry)
+
+    processes = []
+    if addresses is None:
+        addresses, processes = spawn_local_workers(max(1, workers))
+    count = len(addresses)
+
+    connections = []
+    streams = []
+    try:
+        for host, port in addresses:
+            connection = socket.create_connection((host, port))
+            connections.append(connection)
+            streams.append(connection.makefile('rwb'))
+
+        # Hand every worker its applicants; all workers get the capacities
+        for w, stream in enumerate(streams):
+            owned = {a: [preferences[a], pair_ranks[a]] for a in range(w, len(preferences), count)}
+            _send(stream, {'type': 'init', 'worker': w, 'workers': count,
+                           'applicants': owned, 'capacities': capacities})
+        for stream in streams:
+            _receive(stream)
+
+        inboxes = [{'proposals': [], 'rejections': []} for _ in range(count)]
+        start = True
+        while True:
+            for stream, inbox in zip(streams, inboxes):
+                _send(stream, {'type': 'step', 'start': start, **inbox})
+            start = False
+
+            # Route every batch to its destination for the next superstep
+            inboxes = [{'proposals': [], 'rejections': []} for _ in range(count)]
+            pending = 0
+            for stream in streams:
+                outbox = _receive(stream)['outbox']
+                for destination, batch in enumerate(outbox):
+                    inboxes[destination]['proposals'].extend(batch['proposals'])
+                    inboxes[destination]['rejections'].extend(batch['rejections'])
+                    pending += len(batch['proposals']) + len(batch['rejections'])
+
+            # Quiescence: nothing left in flight anywhere
+            if not pending:
+                break
+
+        holders = {}
+        next_to_propose = {}
+        for stream in streams:
+            _send(stream, {'type': 'collect'})
+            state = _receive(stream)
+            holders.update({int(q): students for q, students in state['holders'].items()})
+            next_to_propose.update({int(a): k for a, k in state['next_to_propose'].items()})
+        for stream in streams:
+            _send(stream, {'type': 'stop'})
+    finally:
+        for stream in streams:
+            stream.close()
+        for connection in connections:
+            connection.close()
+        for process in processes:
+            process.join()
+
+    # Write the state back to the entities and build the final matching result
+    result = {}
+    for univ_quota_id, univ_quota in university_quotas.items():
+        students = holders.get(registry.quota_index[univ_quota_id], [])
+        univ_quota.current_matches = [registry.applicants[a] for a in students]
+        result[univ_quota_id] = univ_quota.current_matches.copy()
+
+    for app_id, applicant in applicants.items():
+        applicant.next_to_propose += next_to_propose.get(registry.applicant_index[app_id], 0)
+        applicant.current_match = None
+    for univ_quota_id, students in result.items():
+        for app_id in students:
+            applicants[app_id].current_match = univ_quota_id
+
+    return result
+
+def main():
+    """
+    Run a matching worker for a remote coordinator.
+    """
+    parser = argparse.ArgumentParser(description='Run a distributed Gale-Shapley matching worker.')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Host to bind')
+    parser.add_argument('--port', type=int, default=9100,
+                        help='Port to bind')
+    args = parser.parse_args()
+
+    print(f"Matching worker listening on {args.host}:{args.port}")
+    serve_worker(args.host, args.port)
+    return 0
+
+if __name__ == "__main__":
+    main()
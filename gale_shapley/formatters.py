@@ -1,4 +1,7 @@
-def format_results_markdown(matching, gs_applicants, university_quotas, raw_applicants):
+from .registry import IdRegistry
+from .instance import as_instance
+
+def format_results_markdown(matching, gs_applicants, university_quotas, raw_applicants, registry=None):
     """
     Format matching results as markdown.
     
@@ -6,11 +9,17 @@ def format_results_markdown(matching, gs_applicants, university_quotas, raw_appl
         matching: Dictionary mapping university quota IDs to lists of applicant IDs
         gs_applicants: Dictionary of Applicant objects
         university_quotas: Dictionary of UniversityQuota objects
-        raw_applicants: Dictionary of raw applicant data from CSV
+        raw_applicants: MatchingInstance or dictionary of raw applicant data from CSV
+        registry: Optional IdRegistry; built from the entities if not given
         
     Returns:
         Markdown formatted string with results
     """
+    if registry is None:
+        registry = IdRegistry.from_entities(gs_applicants, university_quotas)
+    instance = as_instance(raw_applicants)
+    applicant_index = instance.registry.applicant_index
+    
     output = "# Admission Results\n\n"
     
     # Count total admitted students
@@ -24,10 +33,10 @@ def format_results_markdown(matching, gs_applicants, university_quotas, raw_appl
     university_results = {}
     
     for quota_id, admitted_students in matching.items():
-        # Parse university ID and quota name
-        parts = quota_id.split('_')
-        univ_id = parts[0]
-        quota_name = '_'.join(parts[1:])
+        # Look up university ID and quota name
+        q = registry.quota_index[quota_id]
+        univ_id = registry.universities[registry.quota_university[q]]
+        quota_name = registry.quota_names[q]
         
         # Initialize university data if not exists
         if univ_id not in university_results:
@@ -53,11 +62,10 @@ def format_results_markdown(matching, gs_applicants, university_quotas, raw_appl
             output += "|---------|--------|\n"
             
             # Sort by points for display
+            q = instance.registry.quota_index[quota_id]
             sorted_students = []
             for student in students:
-                points_key = f"{univ_id}_{quota_name}_points"
-                points = raw_applicants[student][points_key]
-                sorted_students.append((student, int(points)))
+                sorted_students.append((student, instance.points[applicant_index[student]][q]))
                 
             sorted_students.sort(key=lambda x: x[1], reverse=True)
             
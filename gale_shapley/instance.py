@@ -0,0 +1,288 @@
+import gc
+import operator
+from contextlib import contextmanager
+from .models import Applicant, UniversityQuota
+from .registry import IdRegistry, natural_key
+
+@contextmanager
+def _gc_paused():
+    """
+    Pause the cyclic garbage collector while building many acyclic objects.
+
+    Allocating one container per applicant triggers collections that only
+    rescan the raw rows, which costs more than the parsing itself.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+class MatchingInstance:
+    """
+    Typed view of the loaded applicant and university data.
+
+    Every raw CSV row is parsed once, into eligibility sets, integer points,
+    preference lists and guarantees. The pipeline stages then read these
+    fields instead of re-parsing strings.
+    """
+    def __init__(self, raw_applicants, raw_universities=None):
+        """
+        Compile an instance.
+
+        The university/quota layout used for applicant preferences comes from
+        the applicant columns (e.g., "S1_Q2_eligible"), ordered by name. Quota
+        capacities come from the university data when it is given.
+
+        Args:
+            raw_applicants: Dictionary of raw applicant data from CSV
+            raw_universities: Dictionary of raw university data from CSV
+        """
+        self.registry = IdRegistry()
+        self.capacities = {}    # Quota ID -> number of spots, for quotas with spots
+        self.layout = []        # List of (university ID, column names, [(quota ID, index, rank, column names)])
+        self.ranked_quotas = [] # Rank -> quota ID, the quota order for equal university priority
+        self.preferences = []   # Applicant index -> quota IDs in preference order
+        self.points = []        # Applicant index -> {quota index: points} for ranked quotas
+        self.eligible = []      # Applicant index -> quota indexes with program and quota eligibility
+        self.guarantees = []    # Applicant index -> guaranteed university IDs
+        self.rows = []          # Applicant index -> raw CSV row, for scoring formulas
+
+        self.add_universities(raw_universities or {})
+
+        columns = next(iter(raw_applicants.values())).keys() if raw_applicants else []
+        self._build_layout(columns)
+
+        # Parse all rows in one pass; applicant indexes follow the row order
+        self.registry.add_applicants(raw_applicants)
+        self.rows = list(raw_applicants.values())
+
+        with _gc_paused():
+            parse = self.parse_row
+            for row in self.rows:
+                preferences, points, eligible, guarantees = parse(row)
+                self.preferences.append(preferences)
+                self.points.append(points)
+                self.eligible.append(eligible)
+                self.guarantees.append(guarantees)
+
+    def add_universities(self, raw_universities):
+        """
+        Register the quotas with spots and their capacities, in the order of the university data.
+
+        Args:
+            raw_universities: Dictionary of raw university data from CSV
+        """
+        for univ_id, univ_data in raw_universities.items():
+            for quota_key, quota_size in univ_data.items():
+                if quota_size <= 0:
+                    continue
+                quota_name = quota_key.split('_')[0]
+                quota_id = f"{univ_id}_{quota_name}"
+                self.registry.add_quota(quota_id, univ_id, quota_name)
+                self.capacities[quota_id] = quota_size
+
+    def _build_layout(self, columns):
+        """
+        Derive the universities and their quotas from the applicant column names.
+
+        The column names each row is read by are built here once, and every
+        quota gets an integer rank for sorting preferences: quota name first,
+        then university, both ordered by name.
+        """
+        layout = {}
+        for column in columns:
+            if not column or not column.endswith('_eligible'):
+                continue
+            quota_id = column[:-len('_eligible')]
+            univ_id, _, quota_name = quota_id.partition('_')
+            layout.setdefault(univ_id, []).append((quota_id, quota_name))
+            self.registry.add_quota(quota_id, univ_id, quota_name)
+
+        # Quota priority within a university, and ties between universities, follow the names
+        universities = sorted(layout, key=natural_key)
+        ranked = sorted(
+            ((natural_key(quota_name), u, quota_id) for u, univ_id in enumerate(universities)
+             for quota_id, quota_name in layout[univ_id]),
+            key=lambda quota: quota[:2]
+        )
+        self.ranked_quotas = [quota_id for _, _, quota_id in ranked]
+        rank = {quota_id: r for r, quota_id in enumerate(self.ranked_quotas)}
+
+        quota_index = self.registry.quota_index
+        self.layout = []
+        for univ_id in universities:
+            quotas = [
+                (q_id, quota_index[q_id], rank[q_id], f"{q_id}_eligible", f"{q_id}_points")
+                for q_id in sorted((quota_id for quota_id, _ in layout[univ_id]), key=rank.get)
+            ]
+            self.layout.append((univ_id, f"{univ_id}_Kvalifisert?", f"{univ_id}_priority",
+                                f"{univ_id}_guaranteed", quotas))
+
+    def parse_row(self, row):
+        """
+        Parse one raw applicant row without storing it.
+
+        Returns:
+            Tuple of (preferences, points, eligible, guarantees) for the applicant
+        """
+        get = row.get
+        num_ranks = len(self.ranked_quotas)
+        sort_keys = []
+        points = {}
+        eligible = set()
+        guarantees = []
+
+        for univ_id, qualified_key, priority_key, guaranteed_key, quotas in self.layout:
+            if get(guaranteed_key) == 'Yes':
+                guarantees.append(univ_id)
+
+            # Check eligibility for the study program
+            if get(qualified_key) != 'Ja':
+                continue
+            base = int(row[priority_key]) * num_ranks
+
+            # Check quota-specific eligibility
+            for quota_id, q, rank, eligible_key, points_key in quotas:
+                if get(eligible_key) != 'Yes':
+                    continue
+                eligible.add(q)
+                # One integer sorts by university priority, then by quota rank
+                sort_keys.append(base + rank)
+
+                if points_key in row:
+                    points[q] = int(row[points_key])
+
+        sort_keys.sort()
+        ranked_quotas = self.ranked_quotas
+        preferences = [ranked_quotas[key % num_ranks] for key in sort_keys]
+        return preferences, points, eligible, guarantees
+
+    def set_row(self, app_id, row):
+        """
+        Parse one raw applicant row, adding the applicant or replacing their data.
+
+        Args:
+            app_id: Applicant ID
+            row: Raw applicant data from CSV
+
+        Returns:
+            The applicant index
+        """
+        a = self.registry.add_applicant(app_id)
+        if a == len(self.preferences):
+            self.preferences.append(None)
+            self.points.append(None)
+            self.eligible.append(None)
+            self.guarantees.append(None)
+            self.rows.append(None)
+
+        self.preferences[a], self.points[a], self.eligible[a], self.guarantees[a] = self.parse_row(row)
+        self.rows[a] = row
+        return a
+
+    def copy(self):
+        """
+        Copy the instance so rows can be replaced without touching this one.
+
+        Per-applicant entries are shared until replaced by set_row.
+        """
+        other = MatchingInstance.__new__(MatchingInstance)
+        other.registry = self.registry.copy()
+        other.capacities = self.capacities
+        other.layout = self.layout
+        other.ranked_quotas = self.ranked_quotas
+        other.preferences = list(self.preferences)
+        other.points = list(self.points)
+        other.eligible = list(self.eligible)
+        other.guarantees = list(self.guarantees)
+        other.rows = list(self.rows)
+        return other
+
+    def points_of(self, app_id, quota_id):
+        """
+        Get the points an applicant has for a quota.
+        """
+        return self.points[self.registry.applicant_index[app_id]][self.registry.quota_index[quota_id]]
+
+    def applicant_preferences(self):
+        """
+        Create Applicant objects with their preference lists.
+
+        Returns:
+            Dictionary of Applicant objects keyed by ID
+        """
+        with _gc_paused():
+            return {
+                app_id: Applicant(app_id, list(self.preferences[a]))
+                for a, app_id in enumerate(self.registry.applicants)
+            }
+
+    def university_quotas(self):
+        """
+        Create UniversityQuota objects ranking their eligible applicants by points.
+
+        Returns:
+            Dictionary of UniversityQuota objects keyed by ID
+        """
+        quota_index = self.registry.quota_index
+        applicants = self.registry.applicants
+
+        university_quotas = {}
+        for quota_id, capacity in self.capacities.items():
+            q = quota_index[quota_id]
+            scores = {a: points[q] for a, points in enumerate(self.points) if q in points}
+            # Sort by points (higher points = higher ranking); ties keep applicant order
+            ranking = sorted(scores, key=scores.__getitem__, reverse=True)
+            university_quotas[quota_id] = UniversityQuota(quota_id, capacity, [applicants[a] for a in ranking])
+
+        return university_quotas
+
+    def __len__(self):
+        return len(self.registry.applicants)
+
+    def __repr__(self):
+        return f"MatchingInstance(applicants={len(self)}, quotas={len(self.capacities)})"
+
+# The instance last compiled by as_instance, with the raw dictionaries it came from
+_last_compiled = None
+
+def as_instance(raw_applicants, raw_universities=None):
+    """
+    Get a MatchingInstance, compiling raw data if needed.
+
+    The stage functions that accept raw dictionaries all call this, so the
+    last compiled instance is kept and reused while the same applicant
+    dictionary, holding the same row objects, is passed again. University
+    data given for the first time is added to the kept instance; other
+    university data compiles a new one. Rows edited in place are not
+    detected, so pass a new row or dictionary after changing one.
+
+    Args:
+        raw_applicants: MatchingInstance or dictionary of raw applicant data from CSV
+        raw_universities: Dictionary of raw university data from CSV
+
+    Returns:
+        MatchingInstance
+    """
+    global _last_compiled
+    if isinstance(raw_applicants, MatchingInstance):
+        return raw_applicants
+
+    if _last_compiled is not None:
+        applicants, universities, instance = _last_compiled
+        if (applicants is raw_applicants and len(raw_applicants) == len(instance.rows)
+                and all(map(operator.is_, raw_applicants.values(), instance.rows))
+                and all(map(operator.is_, raw_applicants, instance.registry.applicants))):
+            if raw_universities is None or raw_universities is universities:
+                return instance
+            if universities is None:
+                instance.add_universities(raw_universities)
+                _last_compiled = (raw_applicants, raw_universities, instance)
+                return instance
+
+    instance = MatchingInstance(raw_applicants, raw_universities)
+    _last_compiled = (raw_applicants, raw_universities, instance)
+    return instance
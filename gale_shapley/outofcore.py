@@ -0,0 +1,242 @@
+import os
+import csv
+import json
+import mmap
+import heapq
+from array import array
+from .registry import natural_key
+
+# Points stored for applicants eligible for a quota without a points value; with the
+# (points, -applicant) heap key they rank below everyone ranked, in applicant order,
+# like algorithm.unranked_rank
+UNRANKED_POINTS = -(2 ** 31)
+
+# Rough Python memory cost of one in-flight proposal or one held seat
+BYTES_PER_PROPOSAL = 120
+BYTES_PER_HOLDER = 100
+
+PAIRS_FILE = 'pairs.bin'
+OFFSETS_FILE = 'offsets.bin'
+STATE_FILE = 'state.bin'
+APPLICANTS_FILE = 'applicants.txt'
+META_FILE = 'meta.json'
+
+def _load_quotas(universities_file):
+    """
+    Read the quota layout from the universities CSV.
+
+    Universities and their quotas are ordered by name, as in MatchingInstance,
+    so the preference order does not depend on the column order of the files.
+
+    Returns:
+        Tuple of (quota IDs, capacities, per-university list of (quota name, quota sort key, quota index))
+    """
+    quota_ids = []
+    capacities = []
+    university_quotas = {}
+
+    with open(universities_file, 'r') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            univ_id = row['university_id']
+            quotas = []
+            for key in reader.fieldnames:
+                if not key.endswith('_quota'):
+                    continue
+                quota_size = int(row[key])
+                # Empty quotas reject everyone, so they are left out of the preference lists
+                if quota_size <= 0:
+                    continue
+                quota_name = key.split('_')[0]
+                quotas.append((quota_name, natural_key(quota_name), len(quota_ids)))
+                quota_ids.append(f"{univ_id}_{quota_name}")
+                capacities.append(quota_size)
+            university_quotas[univ_id] = sorted(quotas, key=lambda quota: quota[1])
+
+    university_quotas = {univ_id: university_quotas[univ_id] for univ_id in sorted(university_quotas, key=natural_key)}
+    return quota_ids, capacities, university_quotas
+
+def build_store(applicants_file, universities_file, directory):
+    """
+    Stream the input CSVs into memory-mappable preference files.
+
+    Each applicant's eligible quotas are written in preference order (university
+    priority, then quota order) as (quota index, points) int32 pairs, followed by
+    an int64 offsets file indexing every applicant's pairs. Only one CSV row is
+    held in memory at a time.
+
+    Args:
+        applicants_file: Path to applicants CSV file
+        universities_file: Path to universities CSV file
+        directory: Directory to write the store to
+
+    Returns:
+        Dictionary with the store metadata
+    """
+    os.makedirs(directory, exist_ok=True)
+    quota_ids, capacities, university_quotas = _load_quotas(universities_file)
+
+    num_applicants = 0
+    num_pairs = 0
+
+    with open(applicants_file, 'r') as f, \
+            open(os.path.join(directory, PAIRS_FILE), 'wb') as pairs_out, \
+            open(os.path.join(directory, OFFSETS_FILE), 'wb') as offsets_out, \
+            open(os.path.join(directory, APPLICANTS_FILE), 'w') as ids_out:
+        array('q', [0]).tofile(offsets_out)
+
+        for row in csv.DictReader(f):
+            quota_options = []
+            for univ_id, quotas in university_quotas.items():
+                if row.get(f"{univ_id}_Kvalifisert?") != 'Ja':
+                    continue
+                priority = int(row[f"{univ_id}_priority"])
+                for quota_name, order, q in quotas:
+                    if row.get(f"{univ_id}_{quota_name}_eligible") != 'Yes':
+                        continue
+                    points = row.get(f"{univ_id}_{quota_name}_points")
+                    points = int(points) if points not in (None, '') else UNRANKED_POINTS
+                    quota_options.append((priority, order, q, points))
+
+            # Sort by university priority, then by quota priority
+            quota_options.sort(key=lambda x: (x[0], x[1]))
+
+            pairs = array('i')
+            for _, _, q, points in quota_options:
+                pairs.append(q)
+                pairs.append(points)
+            pairs.tofile(pairs_out)
+
+            num_pairs += len(quota_options)
+            num_applicants += 1
+            array('q', [num_pairs]).tofile(offsets_out)
+            ids_out.write(row['applicant_id'] + '\n')
+
+    # Next preference to propose to, per applicant
+    with open(os.path.join(directory, STATE_FILE), 'wb') as state_out:
+        state_out.truncate(4 * max(num_applicants, 1))
+
+    meta = {
+        'quota_ids': quota_ids,
+        'capacities': capacities,
+        'num_applicants': num_applicants,
+        'num_pairs': num_pairs
+    }
+    with open(os.path.join(directory, META_FILE), 'w') as f:
+        json.dump(meta, f)
+
+    return meta
+
+def _map(path, typecode, writable=False):
+    """
+    Memory-map a file as a typed memoryview.
+
+    Returns:
+        Tuple of (mmap object, typed memoryview)
+    """
+    with open(path, 'r+b' if writable else 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None, memoryview(array(typecode))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+    return mapped, memoryview(mapped).cast(typecode)
+
+def outofcore_matching(directory, memory_budget=512 * 1024 * 1024):
+    """
+    Run applicant-proposing Gale-Shapley over a store built by build_store.
+
+    Preference pairs and per-applicant progress stay in memory-mapped files.
+    Free applicants propose in rounds, in index order so the pair file is read
+    sequentially. Their proposals are processed in batches sized by the memory
+    budget and sorted by quota, so each quota's holders are visited once per
+    batch. Deferred acceptance reaches the same applicant-optimal matching in
+    any proposal order, so the result equals the in-memory engine's.
+
+    Args:
+        directory: Directory of the store
+        memory_budget: Approximate number of bytes the matching may keep in memory
+
+    Returns:
+        Dictionary mapping university quota IDs to lists of applicant IDs, best ranked first
+    """
+    with open(os.path.join(directory, META_FILE), 'r') as f:
+        meta = json.load(f)
+
+    quota_ids = meta['quota_ids']
+    capacities = meta['capacities']
+    num_applicants = meta['num_applicants']
+
+    # Whatever the held seats and the free list leave over goes to proposal batches
+    fixed_bytes = BYTES_PER_HOLDER * sum(capacities) + 8 * num_applicants
+    batch_size = max(1024, (memory_budget - fixed_bytes) // BYTES_PER_PROPOSAL)
+
+    pairs_map, pairs = _map(os.path.join(directory, PAIRS_FILE), 'i')
+    offsets_map, offsets = _map(os.path.join(directory, OFFSETS_FILE), 'q')
+    state_map, next_to_propose = _map(os.path.join(directory, STATE_FILE), 'i', writable=True)
+
+    # Min-heaps with the least preferred holder on top: lowest points, then latest in input
+    holders = [[] for _ in quota_ids]
+
+    try:
+        for a in range(num_applicants):
+            next_to_propose[a] = 0
+
+        free_applicants = array('i', range(num_applicants))
+
+        while free_applicants:
+            rejected = array('i')
+
+            for start in range(0, len(free_applicants), batch_size):
+                proposals = []
+                for a in free_applicants[start:start + batch_size]:
+                    k = offsets[a] + next_to_propose[a]
+                    # Applicant has exhausted preferences
+                    if k >= offsets[a + 1]:
+                        continue
+                    next_to_propose[a] += 1
+                    proposals.append((pairs[2 * k], pairs[2 * k + 1], -a))
+
+                # Quota-partitioned batch
+                proposals.sort()
+
+                for q, points, neg_a in proposals:
+                    quota_holders = holders[q]
+                    candidate = (points, neg_a)
+
+                    if len(quota_holders) < capacities[q]:
+                        heapq.heappush(quota_holders, candidate)
+                    elif quota_holders and candidate > quota_holders[0]:
+                        _, neg_rejected = heapq.heapreplace(quota_holders, candidate)
+                        rejected.append(-neg_rejected)
+                    else:
+                        rejected.append(-neg_a)
+
+            # Propose in index order again next round to keep reads sequential
+            free_applicants = array('i', sorted(rejected))
+
+        if state_map is not None:
+            state_map.flush()
+    finally:
+        # Release the typed views before closing the maps
+        del pairs, offsets, next_to_propose
+        for mapped in (pairs_map, offsets_map, state_map):
+            if mapped is not None:
+                mapped.close()
+
+    # Translate back to IDs by streaming the ID file once
+    placement = {}
+    for q, quota_holders in enumerate(holders):
+        for _, neg_a in quota_holders:
+            placement[-neg_a] = q
+
+    names = {}
+    with open(os.path.join(directory, APPLICANTS_FILE), 'r') as f:
+        for a, line in enumerate(f):
+            if a in placement:
+                names[a] = line.rstrip('\n')
+
+    result = {}
+    for q, quota_id in enumerate(quota_ids):
+        ordered = sorted(holders[q], reverse=True)
+        result[quota_id] = [names[-neg_a] for _, neg_a in ordered]
+
+    return result
@@ -0,0 +1,262 @@
+import os
+import heapq
+import bisect
+import multiprocessing
+from .algorithm import unranked_rank
+from .registry import IdRegistry
+
+def resolve_proposals(proposals, holders, capacities):
+    """
+    Resolve a batch of proposals against the current holders of their quotas.
+
+    Each quota merges its sorted batch with its sorted holders in one pass (or
+    inserts it when the batch is small) and keeps the best ranked up to its capacity.
+
+    Args:
+        proposals: List of (quota index, rank, applicant index) tuples
+        holders: Dictionary mapping quota indexes to sorted lists of (rank, applicant index); updated in place
+        capacities: List of quota capacities by quota index
+
+    Returns:
+        List of rejected applicant indexes
+    """
+    proposals.sort()
+    rejected = []
+
+    start = 0
+    while start < len(proposals):
+        q = proposals[start][0]
+        end = start
+        while end < len(proposals) and proposals[end][0] == q:
+            end += 1
+
+        incoming = [(rank, a) for _, rank, a in proposals[start:end]]
+        current = holders.setdefault(q, [])
+
+        if len(incoming) * 8 < len(current):
+            # Small batch against many holders: insert in place instead of rebuilding
+            for entry in incoming:
+                bisect.insort(current, entry)
+        else:
+            current[:] = heapq.merge(current, incoming)
+
+        if len(current) > capacities[q]:
+            rejected.extend(a for _, a in current[capacities[q]:])
+            del current[capacities[q]:]
+
+        start = end
+
+    return rejected
+
+class PartitionWorker:
+    """
+    Matching state for one partition of applicants and quotas.
+
+    Applicant a is owned by worker a % workers and quota q by worker q % workers.
+    Each worker encodes only its own part of the instance: the remaining
+    preferences of its applicants, and the ranks its quotas give to proposers.
+    Applicant owners turn rejections into proposals to the next choice; quota
+    owners resolve proposals against their holders and answer with rejections.
+    """
+    def __init__(self, worker, workers, applicants, university_quotas, registry):
+        """
+        Initialize the worker.
+
+        Args:
+            worker: Index of this worker
+            workers: Total number of workers
+            applicants: Dictionary of Applicant objects keyed by ID
+            university_quotas: Dictionary of UniversityQuota objects keyed by ID
+            registry: IdRegistry covering all applicants and quotas
+        """
+        self.worker = worker
+        self.workers = workers
+        applicant_index = registry.applicant_index
+        quota_index = registry.quota_index
+
+        # Only the preferences the owned applicants have not proposed to yet
+        self.preferences = {}
+        for app_id, applicant in applicants.items():
+            a = applicant_index[app_id]
+            if a % workers == worker:
+                self.preferences[a] = [quota_index[quota_id]
+                                       for quota_id in applicant.preferences[applicant.next_to_propose:]]
+        self.next_to_propose = {a: 0 for a in self.preferences}
+
+        # Ranks by applicant index for the owned quotas; quotas without an entity have no places
+        self.capacities = [0] * len(registry.quotas)
+        self.ranks = {}
+        self.ranked_counts = {}
+        for quota_id, univ_quota in university_quotas.items():
+            q = quota_index[quota_id]
+            if q % workers != worker:
+                continue
+            self.capacities[q] = univ_quota.quota
+            self.ranks[q] = {applicant_index[app_id]: rank for rank, app_id in enumerate(univ_quota.preferences)
+                             if app_id in applicant_index}
+            self.ranked_counts[q] = len(univ_quota.preferences)
+        self.holders = {}
+
+    def step(self, proposals, rejections, start=False):
+        """
+        Process one batch of incoming messages.
+
+        Args:
+            proposals: List of (quota index, applicant index) for owned quotas
+            rejections: List of rejected owned applicant indexes
+            start: Whether this is the first step, where every owned applicant proposes
+
+        Returns:
+            List indexed by destination worker of (proposals, rejections) lists
+        """
+        workers = self.workers
+        outbox = [([], []) for _ in range(workers)]
+
+        for a in (self.preferences if start else rejections):
+            k = self.next_to_propose[a]
+            if k >= len(self.preferences[a]):
+                continue
+            self.next_to_propose[a] = k + 1
+            q = self.preferences[a][k]
+            outbox[q % workers][0].append((q, a))
+
+        ranked = []
+        for q, a in proposals:
+            rank = self.ranks.get(q, {}).get(a)
+            if rank is None:
+                rank = unranked_rank(self.ranked_counts.get(q, 0), a)
+            ranked.append((q, rank, a))
+        for a in resolve_proposals(ranked, self.holders, self.capacities):
+            outbox[a % workers][1].append(a)
+
+        return outbox
+
+    def collect(self):
+        """
+        Get the final state of the owned quotas and applicants.
+
+        Returns:
+            Tuple of (dictionary mapping quota indexes to applicant indexes, best ranked first,
+            dictionary mapping applicant indexes to the number of proposals made)
+        """
+        holders = {q: [a for _, a in quota_holders] for q, quota_holders in self.holders.items()}
+        return holders, self.next_to_propose
+
+def _partition_worker(worker, workers, applicants, university_quotas, registry, inboxes, connection):
+    """
+    Worker process running one partition until no messages are left anywhere.
+
+    Every superstep it sends each peer its batch straight to the peer's inbox,
+    together with the number of messages it sent in total, and reads one batch
+    from every peer. All workers add up the same totals, so they all stop after
+    the same superstep without asking the parent. The final state goes to the
+    parent over the connection.
+    """
+    state = PartitionWorker(worker, workers, applicants, university_quotas, registry)
+    outbox = state.step([], [], start=True)
+
+    while True:
+        sent = sum(len(proposals) + len(rejections) for proposals, rejections in outbox)
+        for destination, batch in enumerate(outbox):
+            if destination != worker:
+                inboxes[destination].put((batch, sent))
+
+        proposals, rejections = outbox[worker]
+        total = sent
+        for _ in range(workers - 1):
+            (incoming_proposals, incoming_rejections), count = inboxes[worker].get()
+            proposals.extend(incoming_proposals)
+            rejections.extend(incoming_rejections)
+            total += count
+
+        # Quiescence: nothing left in flight anywhere
+        if not total:
+            break
+        outbox = state.step(proposals, rejections)
+
+    connection.send(state.collect())
+    connection.close()
+
+def parallel_gale_shapley_matching(applicants, university_quotas, registry=None, workers=None):
+    """
+    Round-synchronous (McVitie-Wilson style) Gale-Shapley matching.
+
+    In every round all free applicants propose to their next choice at once,
+    and each quota resolves its whole batch in a single merge step. Applicants
+    and quotas are partitioned across worker processes, so encoding,
+    proposing and resolving all run in the workers, which exchange their
+    batches directly. Deferred acceptance does not depend on proposal order,
+    so the matching equals the sequential applicant-optimal result.
+
+    Args:
+        applicants: Dictionary of Applicant objects keyed by ID
+        university_quotas: Dictionary of UniversityQuota objects keyed by ID
+        registry: Optional IdRegistry; built from the entities if not given
+        workers: Number of worker processes; defaults to the CPU count, 1 runs in-process
+
+    Returns:
+        Dictionary mapping university quota IDs to lists of applicant IDs, best ranked first
+    """
+    if registry is None:
+        registry = IdRegistry.from_entities(applicants, university_quotas)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(registry.applicants) or 1))
+
+    if workers == 1:
+        state = PartitionWorker(0, 1, applicants, university_quotas, registry)
+        outbox = state.step([], [], start=True)
+        while outbox[0][0] or outbox[0][1]:
+            outbox = state.step(*outbox[0])
+        states = [state.collect()]
+    else:
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(workers)]
+        connections = []
+        processes = []
+        try:
+            for worker in range(workers):
+                parent_end, child_end = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=_partition_worker,
+                    args=(worker, workers, applicants, university_quotas, registry, inboxes, child_end),
+                    daemon=True
+                )
+                process.start()
+                child_end.close()
+                connections.append(parent_end)
+                processes.append(process)
+
+            states = [connection.recv() for connection in connections]
+        except BaseException:
+            # A failed worker leaves its peers waiting for its batches
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for connection in connections:
+                connection.close()
+            for process in processes:
+                process.join()
+
+    holders = {}
+    next_to_propose = {}
+    for worker_holders, worker_next_to_propose in states:
+        holders.update(worker_holders)
+        next_to_propose.update(worker_next_to_propose)
+
+    # Write the state back to the entities and build the final matching result
+    result = {}
+    for univ_quota_id, univ_quota in university_quotas.items():
+        students = holders.get(registry.quota_index[univ_quota_id], [])
+        univ_quota.current_matches = [registry.applicants[a] for a in students]
+        result[univ_quota_id] = univ_quota.current_matches.copy()
+
+    for app_id, applicant in applicants.items():
+        applicant.next_to_propose += next_to_propose.get(registry.applicant_index[app_id], 0)
+        applicant.current_match = None
+    for univ_quota_id, students in result.items():
+        for app_id in students:
+            applicants[app_id].current_match = univ_quota_id
+
+    return result
@@ -0,0 +1,57 @@
+from collections import namedtuple
+from .algorithm import gale_shapley_matching
+from .instance import as_instance
+from .utils import handle_guaranteed_students, compute_cutoffs
+from .statistics import compute_statistics
+
+PipelineResult = namedtuple(
+    'PipelineResult',
+    ['matching', 'cutoffs', 'statistics', 'gs_applicants', 'university_quotas', 'instance']
+)
+
+def run_pipeline(raw_applicants, raw_universities=None, workers=None, nodes=None, scoring=None):
+    """
+    Run every matching stage on a single compiled instance.
+    
+    Args:
+        raw_applicants: MatchingInstance or dictionary of raw applicant data from CSV
+        raw_universities: Dictionary of raw university data from CSV; not needed for a MatchingInstance
+        workers: Run the round-synchronous engine with this many worker processes
+        nodes: Run the distributed engine on the matching workers at these (host, port) addresses
+        scoring: ScoringEngine or scoring formulas to rank quota applicants by instead of their points
+        
+    Returns:
+        PipelineResult with the matching, cut-offs, statistics, entities and the instance
+        the stages read (the scored one when scoring is given)
+    """
+    instance = as_instance(raw_applicants, raw_universities)
+    
+    # Create Gale-Shapley entities
+    if scoring is not None:
+        from .scoring import ScoringEngine
+        if not isinstance(scoring, ScoringEngine):
+            scoring = ScoringEngine(instance, scoring)
+        # Every later stage reads the scored instance, where unscored applicants are not eligible
+        instance = scoring.instance
+        university_quotas = scoring.university_quotas()
+    else:
+        university_quotas = instance.university_quotas()
+    gs_applicants = instance.applicant_preferences()
+    registry = instance.registry
+    
+    # Run Gale-Shapley algorithm
+    if nodes:
+        from .distributed import distributed_gale_shapley_matching
+        matching = distributed_gale_shapley_matching(gs_applicants, university_quotas, nodes, registry=registry)
+    elif workers:
+        # Imported here so single-process runs do not load multiprocessing
+        from .parallel import parallel_gale_shapley_matching
+        matching = parallel_gale_shapley_matching(gs_applicants, university_quotas, registry, workers)
+    else:
+        matching = gale_shapley_matching(gs_applicants, university_quotas, registry)
+    
+    matching = handle_guaranteed_students(matching, instance, gs_applicants, university_quotas, registry)
+    cutoffs = compute_cutoffs(matching, university_quotas, instance)
+    statistics = compute_statistics(matching, instance, university_quotas)
+    
+    return PipelineResult(matching, cutoffs, statistics, gs_applicants, university_quotas, instance)
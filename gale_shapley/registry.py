@@ -0,0 +1,154 @@
+import re
+
+def natural_key(name):
+    """
+    Sort key for university and quota names that compares embedded numbers by value.
+
+    Universities and quotas are ordered by name, so "Q2" comes before "Q10"
+    regardless of the column order of the input files.
+    """
+    return [(0, int(part)) if part.isdigit() else (1, part) for part in re.split(r'(\d+)', name) if part]
+
+class IdRegistry:
+    """
+    Maps applicant, university and quota names to dense integer indexes.
+
+    Quota IDs are split into their university and quota name once, when they
+    are registered, and the parent university of a quota is then looked up
+    by array index.
+    """
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self.applicants = []            # Applicant index -> applicant ID
+        self.applicant_index = {}       # Applicant ID -> applicant index
+        self.universities = []          # University index -> university ID
+        self.university_index = {}      # University ID -> university index
+        self.quotas = []                # Quota index -> quota ID (e.g., "S1_Q1")
+        self.quota_index = {}           # Quota ID -> quota index
+        self.quota_names = []           # Quota index -> quota name (e.g., "Q1")
+        self.quota_university = []      # Quota index -> university index
+
+    @classmethod
+    def from_entities(cls, applicants, university_quotas):
+        """
+        Build a registry from Gale-Shapley entities.
+
+        Args:
+            applicants: Dictionary of Applicant objects keyed by ID
+            university_quotas: Dictionary of UniversityQuota objects keyed by ID
+
+        Returns:
+            IdRegistry covering all applicants and quotas
+        """
+        registry = cls()
+
+        for app_id in applicants:
+            registry.add_applicant(app_id)
+
+        for quota_id in university_quotas:
+            registry.add_quota(quota_id)
+
+        # Preferences may name quotas that were skipped (e.g., zero capacity)
+        for applicant in applicants.values():
+            for quota_id in applicant.preferences:
+                registry.add_quota(quota_id)
+
+        return registry
+
+    def copy(self):
+        """
+        Copy the registry so new IDs can be added without touching this one.
+        """
+        other = IdRegistry()
+        other.applicants = list(self.applicants)
+        other.applicant_index = dict(self.applicant_index)
+        other.universities = list(self.universities)
+        other.university_index = dict(self.university_index)
+        other.quotas = list(self.quotas)
+        other.quota_index = dict(self.quota_index)
+        other.quota_names = list(self.quota_names)
+        other.quota_university = list(self.quota_university)
+        return other
+
+    def add_applicant(self, app_id):
+        """
+        Register an applicant ID.
+
+        Returns:
+            The applicant index
+        """
+        index = self.applicant_index.get(app_id)
+        if index is None:
+            index = len(self.applicants)
+            self.applicant_index[app_id] = index
+            self.applicants.append(app_id)
+        return index
+
+    def add_applicants(self, app_ids):
+        """
+        Register many applicant IDs in order.
+        """
+        applicants = self.applicants
+        applicant_index = self.applicant_index
+        for app_id in app_ids:
+            if app_id not in applicant_index:
+                applicant_index[app_id] = len(applicants)
+                applicants.append(app_id)
+
+    def add_university(self, univ_id):
+        """
+        Register a university ID.
+
+        Returns:
+            The university index
+        """
+        index = self.university_index.get(univ_id)
+        if index is None:
+            index = len(self.universities)
+            self.university_index[univ_id] = index
+            self.universities.append(univ_id)
+        return index
+
+    def add_quota(self, quota_id, univ_id=None, quota_name=None):
+        """
+        Register a quota ID together with its parent university.
+
+        Args:
+            quota_id: Quota ID (e.g., "S1_Q1")
+            univ_id: University ID, parsed from the quota ID if not given
+            quota_name: Quota name, parsed from the quota ID if not given
+
+        Returns:
+            The quota index
+        """
+        index = self.quota_index.get(quota_id)
+        if index is None:
+            if univ_id is None or quota_name is None:
+                parsed_univ, _, parsed_name = quota_id.partition('_')
+                univ_id = parsed_univ if univ_id is None else univ_id
+                quota_name = parsed_name if quota_name is None else quota_name
+
+            index = len(self.quotas)
+            self.quota_index[quota_id] = index
+            self.quotas.append(quota_id)
+            self.quota_names.append(quota_name)
+            self.quota_university.append(self.add_university(univ_id))
+        return index
+
+    def university_of(self, quota_id):
+        """
+        Get the parent university ID of a quota ID.
+        """
+        return self.universities[self.quota_university[self.quota_index[quota_id]]]
+
+    def quota_name_of(self, quota_id):
+        """
+        Get the quota name (e.g., "Q1") of a quota ID.
+        """
+        return self.quota_names[self.quota_index[quota_id]]
+
+    def __repr__(self):
+        return (f"IdRegistry(applicants={len(self.applicants)}, "
+                f"universities={len(self.universities)}, quotas={len(self.quotas)})")
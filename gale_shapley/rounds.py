@@ -0,0 +1,195 @@
+from collections import deque
+from .registry import IdRegistry
+
+# Applicant status in the admission rounds
+ACTIVE = 0
+ACCEPTED = 1
+DECLINED = 2
+
+class AdmissionRounds:
+    """
+    Round-based admission engine with waitlist promotion.
+
+    Starts from a matching and keeps, for every quota, its full ranking with
+    a cursor marking how far down the waitlist offers have gone. Applicants
+    only ever move to quotas they prefer, so a passed-over waitlist entry
+    never becomes eligible again. Each cursor therefore moves forward only,
+    and every round costs time linear in the declines plus the waitlist
+    entries it inspects.
+
+    Freed seats are offered down the waitlist like in a real admission
+    cycle. The matching stays stable for the remaining applicants, but it
+    is not necessarily the applicant-optimal matching a full rerun would give.
+    """
+    def __init__(self, matching, gs_applicants, university_quotas, registry=None):
+        """
+        Initialize the rounds from a matching.
+
+        Args:
+            matching: Dictionary mapping university quota IDs to lists of applicant IDs
+            gs_applicants: Dictionary of Applicant objects keyed by ID
+            university_quotas: Dictionary of UniversityQuota objects keyed by ID
+            registry: Optional IdRegistry; built from the entities if not given
+        """
+        if registry is None:
+            registry = IdRegistry.from_entities(gs_applicants, university_quotas)
+        self.registry = registry
+        self.round_number = 0
+
+        applicant_index = registry.applicant_index
+        quota_index = registry.quota_index
+        num_quotas = len(registry.quotas)
+
+        # Position of each quota in each applicant's preference list
+        self.preference_position = [{} for _ in registry.applicants]
+        for app_id, applicant in gs_applicants.items():
+            positions = self.preference_position[applicant_index[app_id]]
+            for position, quota_id in enumerate(applicant.preferences):
+                positions.setdefault(quota_index[quota_id], position)
+
+        # Ranked waitlists with a cursor per quota
+        self.capacities = [0] * num_quotas
+        self.rankings = [[] for _ in range(num_quotas)]
+        self.cursors = [0] * num_quotas
+        for quota_id, univ_quota in university_quotas.items():
+            q = quota_index[quota_id]
+            self.capacities[q] = univ_quota.quota
+            self.rankings[q] = [applicant_index[app_id] for app_id in univ_quota.preferences
+                                if app_id in applicant_index]
+
+        # Current seat holders; dicts keep the offer order
+        self.holders = [{} for _ in range(num_quotas)]
+        self.assignment = [None] * len(registry.applicants)
+        self.status = [ACTIVE] * len(registry.applicants)
+        self.quota_order = [quota_index[quota_id] for quota_id in matching]
+        for quota_id, students in matching.items():
+            q = quota_index[quota_id]
+            for app_id in students:
+                a = applicant_index[app_id]
+                self.holders[q][a] = True
+                self.assignment[a] = q
+
+    def _wants(self, a, q):
+        """
+        Check whether applicant a would take a seat in quota q.
+        """
+        if self.status[a] != ACTIVE:
+            return False
+        positions = self.preference_position[a]
+        position = positions.get(q)
+        if position is None:
+            return False
+        current = self.assignment[a]
+        return current is None or position < positions[current]
+
+    def apply_round(self, declines=(), accepts=()):
+        """
+        Apply a batch of declines and accepts and promote from the waitlists.
+
+        Declining applicants give up their seat and leave the process.
+        Accepting applicants keep their seat and are no longer promoted.
+        Every ID is checked before anything changes, so a round that raises
+        ValueError for an unknown applicant, or an accept without an offer,
+        leaves the state as it was.
+
+        Args:
+            declines: Iterable of applicant IDs declining their offer
+            accepts: Iterable of applicant IDs accepting their offer
+
+        Returns:
+            List of (applicant ID, previous quota ID or None, new quota ID) promotions in order
+        """
+        applicant_index = self.registry.applicant_index
+
+        accepted = []
+        for app_id in accepts:
+            a = applicant_index.get(app_id)
+            if a is None or self.assignment[a] is None:
+                raise ValueError(f"Applicant {app_id} has no offer to accept")
+            accepted.append(a)
+
+        declined = []
+        for app_id in declines:
+            a = applicant_index.get(app_id)
+            if a is None:
+                raise ValueError(f"Unknown applicant {app_id}")
+            declined.append(a)
+
+        self.round_number += 1
+        for a in accepted:
+            self.status[a] = ACCEPTED
+
+        freed = deque()
+        for a in declined:
+            if self.status[a] == DECLINED:
+                continue
+            self.status[a] = DECLINED
+            q = self.assignment[a]
+            if q is not None:
+                del self.holders[q][a]
+                self.assignment[a] = None
+                freed.append(q)
+
+        # Fill freed seats; every promotion frees the seat the applicant held before
+        promotions = []
+        quotas = self.registry.quotas
+        while freed:
+            q = freed.popleft()
+            ranking = self.rankings[q]
+            quota_holders = self.holders[q]
+
+            while len(quota_holders) < self.capacities[q] and self.cursors[q] < len(ranking):
+                a = ranking[self.cursors[q]]
+                self.cursors[q] += 1
+                if not self._wants(a, q):
+                    continue
+
+                previous = self.assignment[a]
+                if previous is not None:
+                    del self.holders[previous][a]
+                    freed.append(previous)
+                quota_holders[a] = True
+                self.assignment[a] = q
+                promotions.append((self.registry.applicants[a],
+                                   quotas[previous] if previous is not None else None,
+                                   quotas[q]))
+
+        return promotions
+
+    def waitlist(self, quota_id, limit=None):
+        """
+        Get the applicants still waiting for a seat in a quota, in ranking order.
+
+        Args:
+            quota_id: ID of the university quota
+            limit: Maximum number of applicants to return
+
+        Returns:
+            List of applicant IDs
+        """
+        q = self.registry.quota_index[quota_id]
+        ranking = self.rankings[q]
+        waiting = []
+
+        for position in range(self.cursors[q], len(ranking)):
+            if limit is not None and len(waiting) >= limit:
+                break
+            a = ranking[position]
+            if self._wants(a, q):
+                waiting.append(self.registry.applicants[a])
+
+        return waiting
+
+    def matching(self):
+        """
+        Get the current matching.
+
+        Returns:
+            Dictionary mapping university quota IDs to lists of applicant IDs
+        """
+        applicants = self.registry.applicants
+        quotas = self.registry.quotas
+        return {quotas[q]: [applicants[a] for a in self.holders[q]] for q in self.quota_order}
+
+    def __repr__(self):
+        return f"AdmissionRounds(round={self.round_number}, quotas={len(self.registry.quotas)})"
@@ -0,0 +1,204 @@
+import json
+from .models import UniversityQuota
+
+# Formula used for quotas without their own: the quota's points column
+DEFAULT_FORMULA = {'{quota}_points': 1}
+
+def load_formulas(file_path):
+    """
+    Load scoring formulas from a JSON file.
+
+    The file maps quota IDs (or "default") to formulas, where a formula maps
+    column names to weights. Column names may use the placeholders {quota}
+    and {university}, e.g. {"{quota}_points": 1, "grades": 2, "age_points": 0.5}.
+
+    Args:
+        file_path: Path to the JSON file
+
+    Returns:
+        Dictionary mapping quota IDs or "default" to formulas
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def _parse_value(value):
+    """
+    Parse a raw CSV value as a number, or None if it is missing.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+class ScoringEngine:
+    """
+    Ranks quota applicants by weighted sums of applicant columns.
+
+    Each formula is evaluated once, column by column over all applicants, and
+    the score column is cached under the normalized formula, so quotas whose
+    formulas resolve to the same columns and weights share one column. The
+    engine scores a copy of the instance, whose points are replaced by the
+    scores, so rankings, cut-offs and reports all use them while the given
+    instance keeps its points. Applicants missing a term of a quota's formula
+    are not eligible for that quota in the copy. Changing one quota's formula
+    only recomputes that quota.
+    """
+    def __init__(self, instance, formulas=None):
+        """
+        Initialize the engine and apply the formulas to the instance.
+
+        Args:
+            instance: MatchingInstance to score; it is left unchanged
+            formulas: Dictionary mapping quota IDs or "default" to formulas
+        """
+        self.source = instance
+        self.instance = instance.copy()
+        self.formulas = dict(formulas or {})
+        self.columns = {}       # Column name -> parsed values by applicant index
+        self.scores = {}        # Normalized formula -> scores by applicant index
+        self.rankings = {}      # Quota ID -> applicant IDs, best scored first
+        self.quota_keys = {}    # Quota ID -> normalized formula in use
+
+        # Points and eligibility are rewritten per quota, so stop sharing them with the source
+        self.instance.points = [dict(points) for points in instance.points]
+        self.instance.eligible = [set(eligible) for eligible in instance.eligible]
+
+        for quota_id in instance.capacities:
+            self._apply(quota_id)
+
+    def formula_key(self, quota_id):
+        """
+        Resolve and normalize the formula of a quota.
+
+        Placeholders are filled in, zero weights dropped and whole weights made
+        integers, so equivalent formulas get the same key.
+
+        Returns:
+            Sorted tuple of (column name, weight)
+        """
+        formula = self.formulas.get(quota_id, self.formulas.get('default', DEFAULT_FORMULA))
+        univ_id = self.instance.registry.university_of(quota_id)
+
+        terms = {}
+        for column, weight in formula.items():
+            column = column.format(quota=quota_id, university=univ_id)
+            terms[column] = terms.get(column, 0) + weight
+
+        return tuple(sorted(
+            (column, int(weight) if float(weight).is_integer() else weight)
+            for column, weight in terms.items() if weight
+        ))
+
+    def column(self, name):
+        """
+        Get a parsed column for all applicants, parsing it on first use.
+
+        Returns:
+            List of numbers (None where the value is missing) by applicant index
+        """
+        values = self.columns.get(name)
+        if values is None:
+            values = [_parse_value(row.get(name)) for row in self.instance.rows]
+            self.columns[name] = values
+        return values
+
+    def score_column(self, key):
+        """
+        Get the scores for a normalized formula, evaluating it on first use.
+
+        Args:
+            key: Normalized formula as returned by formula_key
+
+        Returns:
+            List of scores (None where a term is missing) by applicant index
+        """
+        scores = self.scores.get(key)
+        if scores is None:
+            scores = [0] * len(self.instance.rows)
+            for name, weight in key:
+                scores = [
+                    score + weight * value if score is not None and value is not None else None
+                    for score, value in zip(scores, self.column(name))
+                ]
+            self.scores[key] = scores
+        return scores
+
+    def _apply(self, quota_id):
+        """
+        Write a quota's scores into the instance and rebuild its ranking.
+
+        Applicants without a score lose the quota from their eligibility and
+        preferences; applicants scored again get it back.
+        """
+        key = self.formula_key(quota_id)
+        scores = self.score_column(key)
+        instance = self.instance
+
+        q = instance.registry.quota_index[quota_id]
+        ranked = []
+        for a, eligible in enumerate(self.source.eligible):
+            if q not in eligible:
+                continue
+            score = scores[a]
+            if score is None:
+                instance.points[a].pop(q, None)
+                if q in instance.eligible[a]:
+                    instance.eligible[a].discard(q)
+                    self._filter_preferences(a)
+            else:
+                instance.points[a][q] = score
+                ranked.append(a)
+                if q not in instance.eligible[a]:
+                    instance.eligible[a].add(q)
+                    self._filter_preferences(a)
+
+        # Sort by score (higher score = higher ranking); ties keep applicant order
+        ranked.sort(key=lambda a: scores[a], reverse=True)
+        self.rankings[quota_id] = [instance.registry.applicants[a] for a in ranked]
+        self.quota_keys[quota_id] = key
+
+    def _filter_preferences(self, a):
+        """
+        Rebuild an applicant's preferences from the source, keeping their eligible quotas.
+        """
+        quota_index = self.instance.registry.quota_index
+        eligible = self.instance.eligible[a]
+        self.instance.preferences[a] = [
+            quota_id for quota_id in self.source.preferences[a] if quota_index[quota_id] in eligible
+        ]
+
+    def set_formula(self, quota_id, formula):
+        """
+        Change the formula of one quota and recompute only that quota.
+
+        Args:
+            quota_id: Quota ID
+            formula: Dictionary mapping column names to weights
+
+        Returns:
+            The quota's new ranking
+        """
+        self.formulas[quota_id] = formula
+        if self.formula_key(quota_id) != self.quota_keys.get(quota_id):
+            self._apply(quota_id)
+        return self.rankings[quota_id]
+
+    def university_quotas(self):
+        """
+        Create UniversityQuota objects ranking their applicants by score.
+
+        Returns:
+            Dictionary of UniversityQuota objects keyed by ID
+        """
+        return {
+            quota_id: UniversityQuota(quota_id, capacity, list(self.rankings[quota_id]))
+            for quota_id, capacity in self.instance.capacities.items()
+        }
+
+    def __repr__(self):
+        return f"ScoringEngine(quotas={len(self.rankings)}, score_columns={len(self.scores)})"
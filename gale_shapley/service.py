@@ -0,0 +1,706 @@
+import asyncio
+import contextlib
+import heapq
+import json
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+from .instance import MatchingInstance
+from .utils import place_guaranteed_students
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    500: 'Internal Server Error'
+}
+
+
+def _priority(points, a, q):
+    """
+    Priority of an applicant in a quota, where higher is better.
+
+    Applicants the quota ranks come first, by points, then the ones it does
+    not rank; ties go to the lower applicant index, as in unranked_rank.
+    """
+    score = points.get(q)
+    if score is None:
+        return (0, 0, -a)
+    return (1, score, -a)
+
+
+class _Fork:
+    """
+    Copy-on-write view of a list indexed by applicant or quota.
+
+    Reads fall through to the base list until an entry is written. With a
+    copy function, an entry is copied on first read so it can be changed in
+    place. The base list only changes on commit.
+    """
+    def __init__(self, base, copy=None):
+        self.base = base
+        self.copy = copy
+        self.changes = {}
+
+    def __getitem__(self, index):
+        try:
+            return self.changes[index]
+        except KeyError:
+            value = self.base[index]
+            if self.copy is not None:
+                value = self.changes[index] = self.copy(value)
+            return value
+
+    def __setitem__(self, index, value):
+        self.changes[index] = value
+
+    def commit(self):
+        """
+        Write the changed entries to the base list, appending indexes past its end.
+        """
+        self._write(self.base)
+
+    def flatten(self):
+        """
+        Plain list with the changes applied, for passes that read every entry.
+        """
+        values = list(self.base)
+        self._write(values)
+        return values
+
+    def _write(self, values):
+        for index in sorted(self.changes):
+            if index < len(values):
+                values[index] = self.changes[index]
+            else:
+                values.append(self.changes[index])
+
+
+class _Proposals:
+    """
+    State of a deferred acceptance run over applicant and quota indexes.
+
+    Besides the holders of each quota and how far each applicant got down
+    their list, it keeps enough history to tell whether an applicant's
+    proposals affected anyone else: whether the applicant was ever displaced,
+    and how many rejections their quota had made when it accepted them.
+    """
+    def __init__(self, holders, next_to_propose, current_match, displaced, accepted_at, rejections):
+        self.holders = holders                  # Quota index -> min-heap of holder priorities, worst first
+        self.next_to_propose = next_to_propose  # Applicant index -> number of proposals made
+        self.current_match = current_match      # Applicant index -> quota index held, or None
+        self.displaced = displaced              # Applicant index -> whether a quota ever dropped them
+        self.accepted_at = accepted_at          # Applicant index -> rejections of their quota when it accepted them
+        self.rejections = rejections            # Quota index -> number of proposals it has rejected
+
+    @classmethod
+    def empty(cls, num_applicants, num_quotas):
+        """
+        State before anyone has proposed.
+        """
+        return cls([[] for _ in range(num_quotas)], [0] * num_applicants, [None] * num_applicants,
+                   [False] * num_applicants, [0] * num_applicants, [0] * num_quotas)
+
+    def fork(self):
+        """
+        Copy-on-write view of this state; running the view leaves this state unchanged.
+        """
+        return _Proposals(_Fork(self.holders, list), _Fork(self.next_to_propose), _Fork(self.current_match),
+                          _Fork(self.displaced), _Fork(self.accepted_at), _Fork(self.rejections))
+
+    def commit(self):
+        """
+        Write the changes of a forked state back to the state it was forked from.
+        """
+        for fork in (self.holders, self.next_to_propose, self.current_match,
+                     self.displaced, self.accepted_at, self.rejections):
+            fork.commit()
+
+    def add_applicant(self, a):
+        """
+        Add an applicant who has not proposed yet.
+        """
+        self.next_to_propose[a] = 0
+        self.current_match[a] = None
+        self.displaced[a] = False
+        self.accepted_at[a] = 0
+
+    def withdraw(self, a, old_preferences, old_points, preferences, points, quota_index):
+        """
+        Take back the proposals an applicant's updated row invalidates.
+
+        The proposals up to the first one whose quota or priority changed are
+        kept. The later ones can only be taken back when they had no effect on
+        anyone else: every rejection among them came straight on proposing,
+        and the quota still held has rejected no one since accepting the
+        applicant. The state is then what the run would have been had the
+        applicant stopped before that proposal.
+
+        Args:
+            a: Applicant index
+            old_preferences: Quota IDs the state was run with, in preference order
+            old_points: Points by quota index the state was run with
+            preferences: Updated quota IDs in preference order
+            points: Updated points by quota index
+            quota_index: Dictionary mapping quota IDs to quota indexes
+
+        Returns:
+            True if the applicant can propose again from the returned point, False if a full run is needed
+        """
+        made = self.next_to_propose[a]
+        keep = 0
+        while keep < made and keep < len(preferences) and old_preferences[keep] == preferences[keep]:
+            q = quota_index[preferences[keep]]
+            if old_points.get(q) != points.get(q):
+                break
+            keep += 1
+        if keep == made:
+            return True
+
+        q = self.current_match[a]
+        rejected_from = made - 1 if q is not None else made
+        if q is not None and self.rejections[q] != self.accepted_at[a]:
+            return False
+        if keep < rejected_from and self.displaced[a]:
+            return False
+
+        if q is not None:
+            quota_holders = self.holders[q]
+            quota_holders.remove(_priority(old_points, a, q))
+            heapq.heapify(quota_holders)
+            self.current_match[a] = None
+        self.next_to_propose[a] = keep
+        return True
+
+    def run(self, free, preferences, points, capacities, quota_index):
+        """
+        Let the free applicants propose until none is left.
+
+        Args:
+            free: Deque of free applicant indexes
+            preferences: Sequence of quota ID preference lists by applicant index
+            points: Sequence of points dictionaries by applicant index
+            capacities: Sequence of quota capacities by quota index
+            quota_index: Dictionary mapping quota IDs to quota indexes
+        """
+        holders = self.holders
+        next_to_propose = self.next_to_propose
+        current_match = self.current_match
+        accepted_at = self.accepted_at
+        rejections = self.rejections
+
+        while free:
+            a = free.popleft()
+            prefs = preferences[a]
+            k = next_to_propose[a]
+            if k >= len(prefs):
+                continue
+            next_to_propose[a] = k + 1
+
+            q = quota_index[prefs[k]]
+            priority = _priority(points[a], a, q)
+            quota_holders = holders[q]
+
+            if len(quota_holders) < capacities[q]:
+                heapq.heappush(quota_holders, priority)
+                current_match[a] = q
+                accepted_at[a] = rejections[q]
+                continue
+
+            rejections[q] += 1
+            if quota_holders and priority > quota_holders[0]:
+                rejected = -heapq.heapreplace(quota_holders, priority)[2]
+                current_match[a] = q
+                accepted_at[a] = rejections[q] - 1
+                current_match[rejected] = None
+                self.displaced[rejected] = True
+                free.append(rejected)
+            else:
+                free.append(a)
+
+
+class WarmInstance:
+    """
+    A loaded admissions instance whose compiled data and matching state stay in memory.
+
+    The MatchingInstance is built once, and the deferred acceptance state
+    behind the current result is kept. A preview or update reparses only
+    the rows it touches and continues deferred acceptance from that state:
+    the updated applicants propose again, and only they and the applicants
+    they displace move. When an updated applicant's earlier proposals
+    displaced or kept out anyone, it falls back to a full run. Guaranteed
+    students are placed again on top of either.
+
+    Admitted applicants are listed best ranked first. Updates must not run
+    concurrently with matches or previews; MatchingService serializes them
+    with a read-write lock.
+    """
+    def __init__(self, raw_applicants, raw_universities):
+        """
+        Initialize a warm instance.
+
+        Args:
+            raw_applicants: Dictionary of raw applicant data from CSV
+            raw_universities: Dictionary of raw university data from CSV
+        """
+        self.version = 0
+        self._result = None
+        self._result_lock = threading.Lock()
+
+        self.instance = MatchingInstance(raw_applicants, raw_universities)
+        registry = self.instance.registry
+
+        self._capacities = [0] * len(registry.quotas)
+        for quota_id, capacity in self.instance.capacities.items():
+            self._capacities[registry.quota_index[quota_id]] = capacity
+
+        # Quotas of each university in reverse name order, the order guaranteed students fill them
+        self._quotas_by_university = {}
+        for quota_id in sorted(self.instance.capacities, reverse=True):
+            q = registry.quota_index[quota_id]
+            self._quotas_by_university.setdefault(registry.quota_university[q], []).append(q)
+
+        self._guaranteed = [a for a, guarantees in enumerate(self.instance.guarantees) if guarantees]
+        self._state = None      # Deferred acceptance state behind the current result
+        self._placed = set()    # Quota indexes the guarantee pass changed in the current result
+
+    def _parse(self, updates):
+        """
+        Parse applicant row updates against the current rows.
+
+        Returns:
+            List of (applicant ID, applicant index, row, parsed row) tuples; new applicants
+            get the indexes a rebuild would give them
+        """
+        registry = self.instance.registry
+        next_index = len(registry.applicants)
+        parsed = []
+
+        for app_id, fields in updates.items():
+            if not isinstance(fields, dict):
+                raise ValueError(f"Update for applicant {app_id} must be an object of fields")
+
+            a = registry.applicant_index.get(app_id)
+            if a is None:
+                a, next_index = next_index, next_index + 1
+                row = {'applicant_id': app_id}
+            else:
+                row = dict(self.instance.rows[a])
+            row.update({key: str(value) for key, value in fields.items()})
+            parsed.append((app_id, a, row, self.instance.parse_row(row)))
+
+        return parsed
+
+    def _evaluate(self, parsed):
+        """
+        Run the matching and guarantee handling with parsed updates applied, without committing them.
+
+        Args:
+            parsed: Parsed updates from _parse
+
+        Returns:
+            Tuple of (state, forked, matching, cutoffs, placed, guaranteed) where forked tells
+            whether state is a fork of the current state rather than a full run
+        """
+        instance = self.instance
+        registry = instance.registry
+        quota_index = registry.quota_index
+        capacities = self._capacities
+
+        names = registry.applicants
+        preferences, points, eligible, guarantees = (
+            instance.preferences, instance.points, instance.eligible, instance.guarantees
+        )
+        if parsed:
+            names, preferences, points, eligible, guarantees = (
+                _Fork(names), _Fork(preferences), _Fork(points), _Fork(eligible), _Fork(guarantees)
+            )
+            for app_id, a, _, fields in parsed:
+                names[a] = app_id
+                preferences[a], points[a], eligible[a], guarantees[a] = fields
+        num_applicants = max([len(instance)] + [a + 1 for _, a, _, _ in parsed])
+
+        # Continue from the current state, unless an updated applicant's proposals cannot be taken back
+        state = None
+        if self._state is not None:
+            state = self._state.fork()
+            free = deque()
+            for _, a, _, _ in parsed:
+                if a >= len(instance):
+                    state.add_applicant(a)
+                elif not state.withdraw(a, instance.preferences[a], instance.points[a],
+                                        preferences[a], points[a], quota_index):
+                    state = None
+                    break
+                if state.current_match[a] is None:
+                    free.append(a)
+        forked = state is not None
+        if not forked:
+            state = _Proposals.empty(num_applicants, len(registry.quotas))
+            free = deque(range(num_applicants))
+            if parsed:
+                preferences, points = preferences.flatten(), points.flatten()
+        state.run(free, preferences, points, capacities, quota_index)
+        moved = set(state.holders.changes) if forked else None
+
+        # Place guaranteed students on copies of the admitted lists
+        updated = {a for _, a, _, _ in parsed}
+        guaranteed = sorted({a for a in self._guaranteed if a not in updated}
+                            | {a for a in updated if guarantees[a]})
+        university_index = registry.university_index
+        students = [
+            (a, [quota_index[quota_id] for quota_id in preferences[a]],
+             {university_index[univ] for univ in guarantees[a] if univ in university_index}, eligible[a])
+            for a in guaranteed
+        ]
+        admitted = _Fork(state.holders, lambda quota_holders: [-priority[2] for priority in quota_holders])
+
+        def rank_of(a, q):
+            score = points[a].get(q)
+            return None if score is None else (-score, a)
+
+        placed = place_guaranteed_students(students, admitted, _Fork(state.current_match), capacities,
+                                           self._quotas_by_university, registry.quota_university, rank_of)
+
+        # Rebuild only the quotas whose admitted applicants may differ from the current result
+        if forked:
+            matching, cutoffs = (dict(part) for part in self._result)
+            changed = moved | self._placed | placed
+        else:
+            matching, cutoffs = {}, {}
+            changed = None
+
+        for quota_id in instance.capacities:
+            q = quota_index[quota_id]
+            if changed is not None and q not in changed:
+                continue
+            ordered = sorted(admitted[q], key=lambda a: _priority(points[a], a, q), reverse=True)
+            matching[quota_id] = [names[a] for a in ordered]
+            if not ordered or len(ordered) < capacities[q]:
+                cutoffs[quota_id] = None
+            else:
+                cutoffs[quota_id] = min(points[a][q] for a in ordered)
+
+        return state, forked, matching, cutoffs, placed, guaranteed
+
+    def match(self):
+        """
+        Get the matching and cut-offs for the current version, computing them at most once.
+
+        Returns:
+            Tuple of (matching, cutoffs)
+        """
+        with self._result_lock:
+            if self._result is None:
+                self._state, _, matching, cutoffs, self._placed, _ = self._evaluate([])
+                self._result = (matching, cutoffs)
+            return self._result
+
+    def preview(self, updates):
+        """
+        Run the matching as if the given applicant updates were applied, without committing them.
+
+        Args:
+            updates: Dictionary mapping applicant IDs to dictionaries of changed fields
+
+        Returns:
+            Tuple of (matching, cutoffs)
+        """
+        parsed = self._parse(updates)
+        self.match()
+        _, _, matching, cutoffs, _, _ = self._evaluate(parsed)
+        return matching, cutoffs
+
+    def update(self, updates):
+        """
+        Commit applicant updates, carrying the matching over to the new version.
+
+        Args:
+            updates: Dictionary mapping applicant IDs to dictionaries of changed fields
+
+        Returns:
+            The new instance version
+        """
+        parsed = self._parse(updates)
+
+        with self._result_lock:
+            state, forked, matching, cutoffs, self._placed, self._guaranteed = self._evaluate(parsed)
+            if forked:
+                state.commit()
+            else:
+                self._state = state
+            self._result = (matching, cutoffs)
+
+            for app_id, _, row, _ in parsed:
+                self.instance.set_row(app_id, row)
+            self.version += 1
+
+        return self.version
+
+
+class ReadWriteLock:
+    """
+    Asyncio lock allowing many concurrent readers or a single writer.
+
+    Waiting writers block new readers so updates are not starved.
+    """
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextlib.asynccontextmanager
+    async def read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def write(self):
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class MatchingService:
+    """
+    Local HTTP/JSON API over a WarmInstance.
+
+    Endpoints:
+        GET  /health   - instance version
+        GET  /match    - matching for the current version
+        GET  /cutoffs  - cut-off points for the current version
+        POST /preview  - matching and cut-offs with uncommitted applicant updates
+        POST /update   - commit applicant updates (serialized writer)
+
+    Request bodies have the form {"applicants": {"<id>": {"<column>": "<value>"}}}.
+    """
+    def __init__(self, instance):
+        """
+        Initialize the service.
+
+        Args:
+            instance: WarmInstance to serve
+        """
+        self.instance = instance
+        self.lock = ReadWriteLock()
+        self.routes = {
+            ('GET', '/health'): self._health,
+            ('GET', '/match'): self._match,
+            ('GET', '/cutoffs'): self._cutoffs,
+            ('POST', '/preview'): self._preview,
+            ('POST', '/update'): self._update
+        }
+
+    async def _health(self, payload):
+        return {'version': self.instance.version}
+
+    async def _match(self, payload):
+        async with self.lock.read():
+            version = self.instance.version
+            matching, _ = await asyncio.get_running_loop().run_in_executor(None, self.instance.match)
+        return {'version': version, 'matching': matching}
+
+    async def _cutoffs(self, payload):
+        async with self.lock.read():
+            version = self.instance.version
+            _, cutoffs = await asyncio.get_running_loop().run_in_executor(None, self.instance.match)
+        return {'version': version, 'cutoffs': cutoffs}
+
+    async def _preview(self, payload):
+        updates = self._updates(payload)
+        async with self.lock.read():
+            version = self.instance.version
+            matching, cutoffs = await asyncio.get_running_loop().run_in_executor(
+                None, self.instance.preview, updates
+            )
+
+        # Report where each previewed applicant would end up
+        placements = {app_id: None for app_id in updates}
+        for quota_id, students in matching.items():
+            for student in students:
+                if student in placements:
+                    placements[student] = quota_id
+
+        return {'version': version, 'matching': matching, 'cutoffs': cutoffs, 'placements': placements}
+
+    async def _update(self, payload):
+        updates = self._updates(payload)
+        async with self.lock.write():
+            version = await asyncio.get_running_loop().run_in_executor(None, self.instance.update, updates)
+        return {'version': version}
+
+    @staticmethod
+    def _updates(payload):
+        """
+        Extract the applicant updates from a request body.
+        """
+        if not isinstance(payload, dict) or not isinstance(payload.get('applicants'), dict):
+            raise ValueError('Request body must be an object with an "applicants" object')
+        return payload['applicants']
+
+    async def dispatch(self, method, path, body):
+        """
+        Route a request to its handler.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            body: Raw request body bytes
+
+        Returns:
+            Tuple of (status code, JSON-serializable payload)
+        """
+        handler = self.routes.get((method, path))
+        if handler is None:
+            return 404, {'error': f"No route for {method} {path}"}
+
+        try:
+            payload = json.loads(body) if body else None
+            return 200, await handler(payload)
+        except (ValueError, KeyError) as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve HTTP/1.1 requests on one connection, keeping it alive between requests.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                if len(parts) != 3:
+                    status, payload = 400, {'error': 'Malformed request line'}
+                    keep_alive = False
+                else:
+                    length = int(headers.get('content-length', 0) or 0)
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.dispatch(parts[0], urlsplit(parts[1]).path, body)
+
+                data = json.dumps(payload).encode()
+                head = (
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                )
+                writer.write(head.encode('latin-1') + data)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """
+        Start listening on a TCP port or, if path is given, a Unix socket.
+
+        Returns:
+            The running asyncio server
+        """
+        if path:
+            return await asyncio.start_unix_server(self.handle_connection, path=path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+class ServiceClient:
+    """
+    Minimal keep-alive HTTP client for a MatchingService.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, path=None):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, method, path, payload=None):
+        """
+        Send a request and wait for the response.
+
+        Returns:
+            Tuple of (status code, decoded JSON payload)
+        """
+        body = json.dumps(payload).encode() if payload is not None else b''
+        head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+        self.writer.write(head.encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        self.writer.close()
+        with contextlib.suppress(ConnectionError):
+            await self.writer.wait_closed()
+
+
+def serve(instance, host='127.0.0.1', port=8765, path=None):
+    """
+    Serve a WarmInstance until interrupted.
+
+    Args:
+        instance: WarmInstance to serve
+        host: Host to bind for TCP
+        port: Port to bind for TCP
+        path: Unix socket path; overrides host and port when given
+    """
+    async def run():
+        server = await MatchingService(instance).start(host, port, path)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
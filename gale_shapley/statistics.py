@@ -0,0 +1,143 @@
+import json
+from .instance import as_instance
+
+def compute_statistics(matching, raw_applicants, university_quotas=None):
+    """
+    Compute per-quota fairness and distribution statistics in one pass over the matching.
+
+    The rank of an assignment is the position (1 = first choice) of the quota in
+    the applicant's preference list. A guaranteed placement is an admitted
+    applicant holding a guarantee for the quota's university. The overall
+    first_choice_share is over all applicants; first_choice_share_of_admitted,
+    overall and per quota, is over the admitted applicants only.
+
+    Args:
+        matching: Dictionary mapping university quota IDs to lists of applicant IDs
+        raw_applicants: MatchingInstance or dictionary of raw applicant data from CSV
+        university_quotas: Optional dictionary of UniversityQuota objects for the capacities
+
+    Returns:
+        JSON-serializable dictionary of overall and per-quota statistics
+    """
+    instance = as_instance(raw_applicants)
+    registry = instance.registry
+    applicant_index = registry.applicant_index
+
+    quota_ids = list(matching)
+    num_quotas = len(quota_ids)
+    max_rank = max((len(preferences) for preferences in instance.preferences), default=0)
+
+    # Preallocated counters, indexed by position in quota_ids
+    admitted = [0] * num_quotas
+    guaranteed = [0] * num_quotas
+    rank_counts = [[0] * max_rank for _ in range(num_quotas)]
+    scored = [0] * num_quotas
+    points_min = [None] * num_quotas
+    points_max = [None] * num_quotas
+    points_sum = [0] * num_quotas
+    overall_ranks = [0] * max_rank
+    matched = set()
+
+    for q, quota_id in enumerate(quota_ids):
+        univ_id = registry.university_of(quota_id)
+        q_index = registry.quota_index[quota_id]
+        quota_rank_counts = rank_counts[q]
+
+        for app_id in matching[quota_id]:
+            a = applicant_index[app_id]
+            matched.add(a)
+            admitted[q] += 1
+
+            preferences = instance.preferences[a]
+            if quota_id in preferences:
+                rank = preferences.index(quota_id)
+                quota_rank_counts[rank] += 1
+                overall_ranks[rank] += 1
+
+            if univ_id in instance.guarantees[a]:
+                guaranteed[q] += 1
+
+            points = instance.points[a].get(q_index)
+            if points is not None:
+                scored[q] += 1
+                points_sum[q] += points
+                if points_min[q] is None or points < points_min[q]:
+                    points_min[q] = points
+                if points_max[q] is None or points > points_max[q]:
+                    points_max[q] = points
+
+    quotas = {}
+    for q, quota_id in enumerate(quota_ids):
+        capacity = university_quotas[quota_id].quota if university_quotas and quota_id in university_quotas \
+            else instance.capacities.get(quota_id, 0)
+        quotas[quota_id] = {
+            'capacity': capacity,
+            'admitted': admitted[q],
+            'rank_histogram': rank_counts[q],
+            'first_choice_share_of_admitted': rank_counts[q][0] / admitted[q] if admitted[q] and max_rank else 0.0,
+            'guaranteed': guaranteed[q],
+            'points': {
+                'min': points_min[q],
+                'max': points_max[q],
+                'mean': points_sum[q] / scored[q] if scored[q] else None
+            }
+        }
+
+    total = len(registry.applicants)
+    return {
+        'total_applicants': total,
+        'admitted': len(matched),
+        'unmatched': total - len(matched),
+        'first_choice_share': overall_ranks[0] / total if total and max_rank else 0.0,
+        'first_choice_share_of_admitted': overall_ranks[0] / len(matched) if matched and max_rank else 0.0,
+        'rank_histogram': overall_ranks,
+        'guaranteed': sum(guaranteed),
+        'quotas': quotas
+    }
+
+def statistics_json(statistics):
+    """
+    Serialize statistics as JSON.
+    """
+    return json.dumps(statistics, indent=2)
+
+def format_statistics_markdown(statistics):
+    """
+    Format statistics as a markdown section for the results report.
+
+    Args:
+        statistics: Dictionary returned by compute_statistics
+
+    Returns:
+        Markdown formatted string
+    """
+    output = "## Statistics\n\n"
+
+    first_choice = statistics['rank_histogram'][0] if statistics['rank_histogram'] else 0
+    output += (f"Admitted to first choice: {first_choice} out of {statistics['total_applicants']} "
+               f"({statistics['first_choice_share']:.0%})\n\n")
+
+    output += ("| Quota | Admitted | Capacity | First choice (of admitted) | Guaranteed "
+               "| Min points | Mean points | Max points |\n")
+    output += ("|-------|----------|----------|----------------------------|------------"
+               "|------------|-------------|------------|\n")
+
+    for quota_id, quota in sorted(statistics['quotas'].items()):
+        points = quota['points']
+        mean = f"{points['mean']:.1f}" if points['mean'] is not None else "-"
+        output += (f"| {quota_id} | {quota['admitted']} | {quota['capacity']} | "
+                   f"{quota['first_choice_share_of_admitted']:.0%} | {quota['guaranteed']} | "
+                   f"{points['min'] if points['min'] is not None else '-'} | {mean} | "
+                   f"{points['max'] if points['max'] is not None else '-'} |\n")
+
+    # Rank-of-assignment histogram
+    ranks = len(statistics['rank_histogram'])
+    if ranks:
+        output += "\n### Rank of Assignment\n\n"
+        output += "| Quota | " + " | ".join(f"Choice {rank + 1}" for rank in range(ranks)) + " |\n"
+        output += "|-------|" + "|".join("-" * (len(f"Choice {rank + 1}") + 2) for rank in range(ranks)) + "|\n"
+        for quota_id, quota in sorted(statistics['quotas'].items()):
+            output += f"| {quota_id} | " + " | ".join(str(count) for count in quota['rank_histogram']) + " |\n"
+        output += "| All | " + " | ".join(str(count) for count in statistics['rank_histogram']) + " |\n"
+
+    return output
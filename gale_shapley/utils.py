@@ -1,5 +1,7 @@
 import csv
-from .models import Applicant, UniversityQuota
+from .registry import IdRegistry
+from .algorithm import encode_instance
+from .instance import MatchingInstance, as_instance
 
 def load_data(applicants_file, universities_file):
     """
@@ -41,231 +43,237 @@ def create_applicant_preferences(raw_applicants):
     Create preference lists for each applicant based on eligibility and university preference.
     
     Args:
-        raw_applicants: Dictionary of raw applicant data from CSV
+        raw_applicants: MatchingInstance or dictionary of raw applicant data from CSV
         
     Returns:
         Dictionary of Applicant objects with preference lists
     """
-    gs_applicants = {}
-    
-    for app_id, app_data in raw_applicants.items():
-        # Get university preferences
-        s1_priority = int(app_data['S1_priority'])
-        s2_priority = int(app_data['S2_priority'])
-        
-        # Create a list of quota categories with university priority
-        quota_options = []
-        
-        # Check eligibility for S1 and its quotas
-        s1_program_eligible = app_data.get('S1_Kvalifisert?') == 'Ja'
-        
-        if s1_program_eligible:
-            if 'S1_Q1_eligible' in app_data and app_data['S1_Q1_eligible'] == 'Yes':
-                quota_options.append(('S1_Q1', s1_priority, 1))
-            if 'S1_Q2_eligible' in app_data and app_data['S1_Q2_eligible'] == 'Yes':
-                quota_options.append(('S1_Q2', s1_priority, 2))
-            if 'S1_Q3_eligible' in app_data and app_data['S1_Q3_eligible'] == 'Yes':
-                quota_options.append(('S1_Q3', s1_priority, 3))
-        
-        # Check eligibility for S2 and its quotas
-        s2_program_eligible = app_data.get('S2_Kvalifisert?') == 'Ja'
-            
-        if s2_program_eligible:
-            if 'S2_Q1_eligible' in app_data and app_data['S2_Q1_eligible'] == 'Yes':
-                quota_options.append(('S2_Q1', s2_priority, 1))
-            if 'S2_Q2_eligible' in app_data and app_data['S2_Q2_eligible'] == 'Yes':
-                quota_options.append(('S2_Q2', s2_priority, 2))
-        
-        # Sort by university priority, then by quota priority
-        quota_options.sort(key=lambda x: (x[1], x[2]))
-        
-        # Extract just the quota category names for the preference list
-        preferences = [option[0] for option in quota_options]
-        
-        # Create Applicant object
-        gs_applicants[app_id] = Applicant(app_id, preferences)
-    
-    return gs_applicants
+    return as_instance(raw_applicants).applicant_preferences()
 
-def create_university_quotas(raw_applicants, raw_universities):
+def create_university_quotas(raw_applicants, raw_universities=None):
     """
     Create UniversityQuota objects with rankings of students.
     
     Args:
-        raw_applicants: Dictionary of raw applicant data from CSV
-        raw_universities: Dictionary of raw university data from CSV
+        raw_applicants: MatchingInstance or dictionary of raw applicant data from CSV
+        raw_universities: Dictionary of raw university data from CSV; not needed for a MatchingInstance
         
     Returns:
         Dictionary of UniversityQuota objects
     """
-    university_quotas = {}
-    
-    # Get all university IDs
-    university_ids = list(raw_universities.keys())
-    
-    # Process each university
-    for univ_id in university_ids:
-        # Get quota data
-        univ_data = raw_universities[univ_id]
-        
-        # Process each quota
-        for quota_key, quota_size in univ_data.items():
-            # Extract quota name (e.g., "Q1" from "Q1_quota")
-            quota_name = quota_key.split('_')[0]
-            
-            # Skip empty quotas
-            if quota_size <= 0:
-                continue
-            
-            quota_id = f"{univ_id}_{quota_name}"
-            
-            # Collect eligible students with their points
-            eligible_students = []
-            for app_id, app_data in raw_applicants.items():
-                # Check base eligibility for the study program
-                program_eligibility_key = f"{univ_id}_Kvalifisert?"
-                
-                # Check quota-specific eligibility
-                quota_eligibility_key = f"{univ_id}_{quota_name}_eligible"
-                points_key = f"{univ_id}_{quota_name}_points"
-                
-                # Student must be eligible for both the program AND the specific quota
-                if (
-                    program_eligibility_key in app_data and
-                    app_data[program_eligibility_key] == 'Ja' and
-                    quota_eligibility_key in app_data and 
-                    app_data[quota_eligibility_key] == 'Yes' and 
-                    points_key in app_data
-                ):
-                    points = int(app_data[points_key])
-                    eligible_students.append((app_id, points))
-            
-            # Sort by points (higher points = higher ranking)
-            eligible_students.sort(key=lambda x: x[1], reverse=True)
-            
-            # Create ranking list - ONLY including eligible students
-            ranking = [student[0] for student in eligible_students]
-            
-            # Create UniversityQuota object
-            university_quotas[quota_id] = UniversityQuota(quota_id, quota_size, ranking)
-    
-    return university_quotas
+    return as_instance(raw_applicants, raw_universities).university_quotas()
 
-def handle_guaranteed_students(matching, raw_applicants, gs_applicants, university_quotas):
+def _any_guarantee(raw_applicants):
     """
-    Ensure that guaranteed students are offered a place according to their preferences,
-    placing them in the rightmost (lowest priority) quota that has spots.
+    Check whether any raw applicant row holds a guarantee.
+    """
+    if not raw_applicants:
+        return False
+    columns = [column for column in next(iter(raw_applicants.values())) if column.endswith('_guaranteed')]
+    return any(row.get(column) == 'Yes' for row in raw_applicants.values() for column in columns)
+
+def place_guaranteed_students(students, admitted, placement, capacities, quotas_by_university,
+                              quota_university, rank_of):
+    """
+    Move guaranteed students into their most preferred guaranteed university, by integer index.
+    
+    Each student not already at that university takes a spare place in the first
+    eligible quota of quotas_by_university, or else the place of its lowest-ranked
+    holder. Students are handled in the given order, and admitted and placement
+    are updated in place.
     
     Args:
-        matching: Current matching result from the algorithm
-        raw_applicants: Raw applicant data from CSV
-        gs_applicants: Gale-Shapley applicant objects
-        university_quotas: Gale-Shapley university quota objects
+        students: List of (applicant index, preferred quota indexes, guaranteed university indexes,
+                  eligible quota indexes) tuples
+        admitted: Mapping of quota index to the list of admitted applicant indexes
+        placement: Sequence of the quota index each applicant holds, or None
+        capacities: Sequence of quota capacities by quota index
+        quotas_by_university: Dictionary mapping university indexes to quota indexes in the order to fill them
+        quota_university: Sequence of the university index of each quota
+        rank_of: Function (applicant, quota) returning a comparable rank, lower is better,
+                 or None for a quota that does not rank the applicant
         
     Returns:
-        Updated matching dictionary
+        Set of quota indexes whose admitted lists changed
     """
-    # Find which students have guarantees for which universities
-    students_with_guarantees = {}
-    
-    for app_id, app_data in raw_applicants.items():
-        guaranteed_universities = []
-        
-        if app_data.get('S1_guaranteed') == 'Yes':
-            guaranteed_universities.append('S1')
-        if app_data.get('S2_guaranteed') == 'Yes':
-            guaranteed_universities.append('S2')
-        
-        if guaranteed_universities:
-            students_with_guarantees[app_id] = guaranteed_universities
-    
-    # If no students have guarantees, no action needed
-    if not students_with_guarantees:
-        return matching
+    changed = set()
     
     # For each student with guarantees
-    for student_id, guaranteed_univs in students_with_guarantees.items():
+    for a, preferences, guaranteed, eligible in students:
         # Check where (if anywhere) the student is currently matched
-        current_match = None
-        current_match_quota = None
-        
-        for quota_id, matches in matching.items():
-            if student_id in matches:
-                current_match = quota_id.split('_')[0]  # Extract university part
-                current_match_quota = quota_id
-                break
+        current_q = placement[a]
+        current_univ = quota_university[current_q] if current_q is not None else None
         
         # Get student's preference order for universities
         university_preferences = []
-        for pref in gs_applicants[student_id].preferences:
-            univ = pref.split('_')[0]
-            if univ in guaranteed_univs and univ not in university_preferences:
+        for q in preferences:
+            univ = quota_university[q]
+            if univ in guaranteed and univ not in university_preferences:
                 university_preferences.append(univ)
         
         # If student is already matched to their highest preferred guaranteed university, no action needed
-        if current_match in university_preferences:
-            current_univ_index = university_preferences.index(current_match)
-            if current_univ_index == 0:  # Already in highest preferred guaranteed university
-                continue
+        if university_preferences and current_univ == university_preferences[0]:
+            continue
         
         # Student needs to be placed in a guaranteed spot
         # Try each guaranteed university in preference order
         for guaranteed_univ in university_preferences:
-            # Find all quotas for this university that the student is eligible for
-            eligible_quotas = []
-            
-            for quota_id in matching.keys():
-                univ_id, quota_name = quota_id.split('_', 1)
-                
-                if univ_id == guaranteed_univ:
-                    program_eligibility_key = f"{univ_id}_Kvalifisert?"
-                    quota_eligibility_key = f"{univ_id}_{quota_name}_eligible"
-                    
-                    if (raw_applicants[student_id].get(program_eligibility_key) == 'Ja' and
-                        raw_applicants[student_id].get(quota_eligibility_key) == 'Yes'):
-                        eligible_quotas.append(quota_id)
-            
-            # Sort quotas by name in reverse order (Q3, Q2, Q1) to prioritize rightmost quota
-            eligible_quotas.sort(reverse=True)
-            
             # Try to place student in eligible quotas
-            for quota_id in eligible_quotas:
+            for q in quotas_by_university.get(guaranteed_univ, []):
+                if q not in eligible:
+                    continue
+                
                 # Remove from current match if any
-                if current_match_quota and student_id in matching[current_match_quota]:
-                    matching[current_match_quota].remove(student_id)
-                    current_match_quota = None
+                if current_q is not None and a in admitted[current_q]:
+                    admitted[current_q].remove(a)
+                    changed.add(current_q)
+                    placement[a] = None
+                    current_q = None
                 
                 # Add student to this quota
-                if len(matching[quota_id]) < university_quotas[quota_id].quota:
+                if len(admitted[q]) < capacities[q]:
                     # There's space available
-                    matching[quota_id].append(student_id)
-                    current_match_quota = quota_id
+                    admitted[q].append(a)
+                    changed.add(q)
+                    placement[a] = q
+                    current_q = q
+                    break
+                
+                # Find the lowest-ranked student currently matched
+                lowest_ranked = None
+                lowest_rank = None
+                for holder in admitted[q]:
+                    rank = rank_of(holder, q)
+                    if rank is not None and (lowest_ranked is None or rank > lowest_rank):
+                        lowest_ranked = holder
+                        lowest_rank = rank
+                
+                # Replace the lowest-ranked student
+                if lowest_ranked is not None:
+                    admitted[q].remove(lowest_ranked)
+                    admitted[q].append(a)
+                    changed.add(q)
+                    placement[lowest_ranked] = None
+                    placement[a] = q
+                    current_q = q
                     break
-                else:
-                    # Need to remove the lowest-ranked student
-                    quota_preferences = university_quotas[quota_id].preferences
-                    
-                    # Find the lowest-ranked student currently matched
-                    current_matches = matching[quota_id]
-                    lowest_ranked = None
-                    lowest_rank = -1
-                    
-                    for match_id in current_matches:
-                        if match_id in quota_preferences:
-                            rank = quota_preferences.index(match_id)
-                            if lowest_ranked is None or rank > lowest_rank:
-                                lowest_ranked = match_id
-                                lowest_rank = rank
-                    
-                    # Replace the lowest-ranked student
-                    if lowest_ranked:
-                        matching[quota_id].remove(lowest_ranked)
-                        matching[quota_id].append(student_id)
-                        current_match_quota = quota_id
-                        break
             
             # If we successfully placed the student, break out of the university loop
-            if current_match_quota:
+            if current_q is not None:
                 break
     
-    return matching
\ No newline at end of file
+    return changed
+
+def handle_guaranteed_students(matching, raw_applicants, gs_applicants, university_quotas, registry=None):
+    """
+    Ensure that guaranteed students are offered a place according to their preferences,
+    placing them in the rightmost (lowest priority) quota that has spots.
+    
+    Args:
+        matching: Current matching result from the algorithm
+        raw_applicants: MatchingInstance or raw applicant data from CSV
+        gs_applicants: Gale-Shapley applicant objects
+        university_quotas: Gale-Shapley university quota objects
+        registry: Optional IdRegistry; built from the entities if not given
+        
+    Returns:
+        Updated matching dictionary
+    """
+    # Without a single guarantee there is nothing to place, so raw data is not compiled
+    if not isinstance(raw_applicants, MatchingInstance) and not _any_guarantee(raw_applicants):
+        return matching
+    
+    instance = as_instance(raw_applicants)
+    
+    # Find which students have guarantees for which universities
+    students_with_guarantees = [
+        (app_id, instance.guarantees[a], instance.eligible[a])
+        for a, app_id in enumerate(instance.registry.applicants) if instance.guarantees[a]
+    ]
+    
+    # If no students have guarantees, no action needed
+    if not students_with_guarantees:
+        return matching
+    
+    if registry is None:
+        registry = IdRegistry.from_entities(gs_applicants, university_quotas)
+    applicant_index = registry.applicant_index
+    quota_index = registry.quota_index
+    quota_university = registry.quota_university
+    instance_quotas = instance.registry.quotas
+    
+    # Full preference lists with the rank each student holds in each preferred quota
+    preferences, pair_ranks, capacities = encode_instance(gs_applicants, university_quotas, registry, from_start=True)
+    
+    # Admitted students and the placement of each student, by integer index
+    admitted = {}
+    placement = [None] * len(registry.applicants)
+    for quota_id, matches in matching.items():
+        q = quota_index[quota_id]
+        admitted[q] = [applicant_index[student_id] for student_id in matches]
+        for a in admitted[q]:
+            placement[a] = q
+    
+    # Quotas of each university, sorted by name in reverse order (Q3, Q2, Q1) to prioritize rightmost quota
+    quotas_by_university = {}
+    for quota_id in sorted(matching, reverse=True):
+        q = quota_index[quota_id]
+        quotas_by_university.setdefault(quota_university[q], []).append(q)
+    
+    ranked_counts = {quota_index[quota_id]: len(quota.preferences) for quota_id, quota in university_quotas.items()}
+    
+    def rank_of(a, q):
+        # Rank of a student in a quota's ranking, or None if the quota does not rank them
+        prefs = preferences[a]
+        if q not in prefs:
+            return None
+        rank = pair_ranks[a][prefs.index(q)]
+        return rank if rank < ranked_counts.get(q, 0) else None
+    
+    students = []
+    for student_id, guaranteed_univs, student_eligible in students_with_guarantees:
+        a = applicant_index[student_id]
+        guaranteed = {registry.university_index[univ] for univ in guaranteed_univs if univ in registry.university_index}
+        eligible = {quota_index[instance_quotas[q]] for q in student_eligible if instance_quotas[q] in quota_index}
+        students.append((a, preferences[a], guaranteed, eligible))
+    
+    changed = place_guaranteed_students(students, admitted, placement, capacities, quotas_by_university,
+                                        quota_university, rank_of)
+    
+    # Translate the changed quotas back to IDs
+    for q in changed:
+        matching[registry.quotas[q]][:] = [registry.applicants[a] for a in admitted[q]]
+    
+    return matching
+
+def compute_cutoffs(matching, university_quotas, raw_applicants):
+    """
+    Compute the admission cut-off (lowest admitted points) for each quota.
+    
+    A quota that did not fill its capacity has no cut-off, since every
+    eligible applicant who wanted a place there got one.
+    
+    Args:
+        matching: Dictionary mapping university quota IDs to lists of applicant IDs
+        university_quotas: Dictionary of UniversityQuota objects
+        raw_applicants: MatchingInstance or dictionary of raw applicant data from CSV
+        
+    Returns:
+        Dictionary mapping university quota IDs to the cut-off points or None
+    """
+    instance = as_instance(raw_applicants)
+    applicant_index = instance.registry.applicant_index
+    quota_index = instance.registry.quota_index
+    cutoffs = {}
+    
+    for quota_id, admitted_students in matching.items():
+        capacity = university_quotas[quota_id].quota if quota_id in university_quotas else 0
+        
+        if not admitted_students or len(admitted_students) < capacity:
+            cutoffs[quota_id] = None
+            continue
+        
+        q = quota_index[quota_id]
+        cutoffs[quota_id] = min(instance.points[applicant_index[student]][q] for student in admitted_students)
+    
+    return cutoffs
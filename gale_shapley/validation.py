@@ -0,0 +1,263 @@
+import os
+import csv
+from collections import namedtuple
+
+ValidationIssue = namedtuple('ValidationIssue', ['severity', 'file', 'line', 'column', 'message'])
+
+PreflightResult = namedtuple(
+    'PreflightResult',
+    ['raw_applicants', 'raw_universities', 'errors', 'warnings', 'issues']
+)
+
+QUALIFIED_VALUES = ('Ja', 'Nei')
+YES_NO_VALUES = ('Yes', 'No')
+
+class _TooManyErrors(Exception):
+    pass
+
+class _Reporter:
+    """
+    Collects issues and streams each one to the report as soon as it is found.
+    """
+    def __init__(self, report, max_errors):
+        self.report = report
+        self.max_errors = max_errors
+        self.issues = []
+        self.errors = 0
+        self.warnings = 0
+
+    def add(self, severity, file, line, column, message):
+        issue = ValidationIssue(severity, file, line, column, message)
+        self.issues.append(issue)
+        if self.report is not None:
+            self.report.write(format_issue(issue) + "\n")
+
+        if severity == 'error':
+            self.errors += 1
+            if self.max_errors is not None and self.errors >= self.max_errors:
+                raise _TooManyErrors()
+        else:
+            self.warnings += 1
+
+def format_issue(issue):
+    """
+    Format an issue as a single report line.
+    """
+    location = f"{issue.file}:{issue.line}" if issue.line else issue.file
+    column = f" {issue.column}:" if issue.column else ""
+    return f"{issue.severity}: {location}:{column} {issue.message}"
+
+def _is_int(value):
+    """
+    Check that a value parses the way the matching stages parse it.
+    """
+    # Fast path for plain digits, which int() always accepts
+    if value.isdecimal():
+        return True
+    try:
+        int(value)
+        return True
+    except ValueError:
+        return False
+
+def _check_universities(reader, name, reporter):
+    """
+    Validate the universities file and build the raw university data.
+    """
+    header = next(reader, None)
+    if not header or 'university_id' not in header:
+        reporter.add('error', name, 1, 'university_id', "missing university_id column")
+        return None
+
+    id_pos = header.index('university_id')
+    quota_columns = [(pos, column) for pos, column in enumerate(header) if column.endswith('_quota')]
+    width = len(header)
+
+    raw_universities = {}
+    for row in reader:
+        line = reader.line_num
+        if len(row) != width:
+            reporter.add('error', name, line, None, f"expected {width} fields, found {len(row)}")
+            continue
+
+        univ_id = row[id_pos]
+        if not univ_id:
+            reporter.add('error', name, line, 'university_id', "empty university ID")
+            continue
+        if univ_id in raw_universities:
+            reporter.add('error', name, line, 'university_id', f"duplicate university ID {univ_id!r}")
+            continue
+
+        quota_data = {}
+        for pos, column in quota_columns:
+            value = row[pos]
+            if not _is_int(value) or int(value) < 0:
+                reporter.add('error', name, line, column, f"quota must be a non-negative integer, got {value!r}")
+                continue
+            quota_data[column] = int(value)
+
+        raw_universities[univ_id] = quota_data
+
+    return raw_universities
+
+def _index_applicant_columns(header, name, raw_universities, reporter):
+    """
+    Check the applicant header and index the columns each row check needs.
+
+    Returns:
+        List of (university ID, priority position, qualified position, guaranteed position,
+        [(quota ID, eligible position, points position)]), or None on header errors
+    """
+    errors = reporter.errors
+    positions = {}
+    for pos, column in enumerate(header):
+        if column in positions:
+            reporter.add('error', name, 1, column, "duplicate column")
+        positions[column] = pos
+
+    if 'applicant_id' not in positions:
+        reporter.add('error', name, 1, 'applicant_id', "missing applicant_id column")
+
+    # Universities and their quotas, as the matching stages derive them from the eligibility columns
+    layout = {}
+    for column in header:
+        if column.endswith('_eligible'):
+            quota_id = column[:-len('_eligible')]
+            univ_id, _, quota_name = quota_id.partition('_')
+            layout.setdefault(univ_id, []).append((quota_id, quota_name))
+
+    columns = []
+    for univ_id, quotas in layout.items():
+        if univ_id not in raw_universities:
+            reporter.add('error', name, 1, f"{quotas[0][0]}_eligible",
+                         f"university {univ_id!r} is not in the universities file")
+        for column in (f"{univ_id}_priority", f"{univ_id}_Kvalifisert?"):
+            if column not in positions:
+                reporter.add('error', name, 1, column, "missing column")
+
+        quota_columns = []
+        for quota_id, quota_name in quotas:
+            if univ_id in raw_universities and f"{quota_name}_quota" not in raw_universities[univ_id]:
+                reporter.add('error', name, 1, f"{quota_id}_eligible",
+                             f"quota {quota_name!r} is not in the universities file")
+            points_pos = positions.get(f"{quota_id}_points")
+            if points_pos is None:
+                reporter.add('error', name, 1, f"{quota_id}_points", "missing column")
+            quota_columns.append((quota_id, positions[f"{quota_id}_eligible"], points_pos))
+
+        columns.append((univ_id, positions.get(f"{univ_id}_priority"), positions.get(f"{univ_id}_Kvalifisert?"),
+                        positions.get(f"{univ_id}_guaranteed"), quota_columns))
+
+    return columns if reporter.errors == errors else None
+
+def _check_applicants(reader, name, raw_universities, reporter):
+    """
+    Validate the applicants file row by row and build the raw applicant data.
+    """
+    header = next(reader, None)
+    if not header:
+        reporter.add('error', name, 1, None, "empty file")
+        return None
+
+    columns = _index_applicant_columns(header, name, raw_universities, reporter)
+    if columns is None:
+        return None
+
+    id_pos = header.index('applicant_id')
+    width = len(header)
+
+    raw_applicants = {}
+    for row in reader:
+        line = reader.line_num
+        if len(row) != width:
+            reporter.add('error', name, line, None, f"expected {width} fields, found {len(row)}")
+            continue
+
+        app_id = row[id_pos]
+        if not app_id:
+            reporter.add('error', name, line, 'applicant_id', "empty applicant ID")
+            continue
+        if app_id in raw_applicants:
+            reporter.add('error', name, line, 'applicant_id', f"duplicate applicant ID {app_id!r}")
+            continue
+
+        for univ_id, priority_pos, qualified_pos, guaranteed_pos, quota_columns in columns:
+            qualified = row[qualified_pos]
+            if qualified not in QUALIFIED_VALUES:
+                reporter.add('error', name, line, header[qualified_pos], f"expected Ja or Nei, got {qualified!r}")
+            if guaranteed_pos is not None and row[guaranteed_pos] not in YES_NO_VALUES:
+                reporter.add('error', name, line, header[guaranteed_pos],
+                             f"expected Yes or No, got {row[guaranteed_pos]!r}")
+
+            # Priority and points are only parsed for qualified applicants
+            qualified = qualified == 'Ja'
+            if qualified and not _is_int(row[priority_pos]):
+                reporter.add('error', name, line, header[priority_pos],
+                             f"priority must be an integer, got {row[priority_pos]!r}")
+
+            any_eligible = False
+            for quota_id, eligible_pos, points_pos in quota_columns:
+                eligible = row[eligible_pos]
+                if eligible not in YES_NO_VALUES:
+                    reporter.add('error', name, line, header[eligible_pos], f"expected Yes or No, got {eligible!r}")
+                elif qualified and eligible == 'Yes':
+                    any_eligible = True
+                    if not _is_int(row[points_pos]):
+                        reporter.add('error', name, line, header[points_pos],
+                                     f"points must be an integer, got {row[points_pos]!r}")
+
+            # Guarantees are only honoured through quotas the applicant is qualified and eligible for
+            if guaranteed_pos is not None and row[guaranteed_pos] == 'Yes':
+                if not qualified:
+                    reporter.add('warning', name, line, header[guaranteed_pos],
+                                 f"guarantee has no effect; applicant is not qualified for {univ_id}")
+                elif not any_eligible:
+                    reporter.add('warning', name, line, header[guaranteed_pos],
+                                 f"guarantee has no effect; applicant is not eligible for any {univ_id} quota")
+
+        raw_applicants[app_id] = dict(zip(header, row))
+
+    return raw_applicants
+
+def preflight(applicants_file, universities_file, report=None, max_errors=None):
+    """
+    Validate and load the input files in a single pass.
+
+    Checks value types, eligibility values, universities, quotas and points
+    columns referenced by the applicant columns, and duplicate IDs, so bad
+    rows are rejected before the matching stages run. Guarantees that cannot
+    take effect, because the applicant is not qualified for the university or
+    eligible for any of its quotas, are reported as warnings. Quota
+    eligibility without program qualification is not reported: it is
+    ignored by design, like any other field of an unqualified university.
+    Each issue is written to the report as soon as it is found.
+
+    Args:
+        applicants_file: Path to applicants CSV file
+        universities_file: Path to universities CSV file
+        report: Optional file-like object to stream issues to
+        max_errors: Stop validating after this many errors
+
+    Returns:
+        PreflightResult with the raw data as returned by load_data, or None
+        for both when there are errors
+    """
+    reporter = _Reporter(report, max_errors)
+    raw_applicants = None
+    raw_universities = None
+
+    try:
+        with open(universities_file, 'r') as f:
+            raw_universities = _check_universities(csv.reader(f), os.path.basename(universities_file), reporter)
+
+        if raw_universities is not None:
+            with open(applicants_file, 'r') as f:
+                raw_applicants = _check_applicants(csv.reader(f), os.path.basename(applicants_file),
+                                                   raw_universities, reporter)
+    except _TooManyErrors:
+        pass
+
+    if reporter.errors:
+        raw_applicants = raw_universities = None
+
+    return PreflightResult(raw_applicants, raw_universities, reporter.errors, reporter.warnings, reporter.issues)
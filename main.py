@@ -1,14 +1,61 @@
 import os
+import sys
 import argparse
-from gale_shapley import (
-    load_data,
-    create_applicant_preferences,
-    create_university_quotas,
-    gale_shapley_matching,
-    handle_guaranteed_students,  # Add this import
-    format_results_markdown,
-    save_results
-)
+
+# gale_shapley names are imported where they are used, so a run only loads what it needs
+
+def run_matching(raw_applicants, raw_universities, verbose=False, workers=None, nodes=None, scoring=None):
+    """
+    Compile the instance, run the matching and format the results.
+    
+    Args:
+        raw_applicants: Dictionary of raw applicant data from CSV
+        raw_universities: Dictionary of raw university data from CSV
+        verbose: Print progress and samples of the built entities
+        workers: Run the round-synchronous engine with this many worker processes
+        nodes: Run the distributed engine on the matching workers at these (host, port) addresses
+        scoring: Scoring formulas to rank quota applicants by instead of their points
+        
+    Returns:
+        Tuple of (matching, cutoffs, statistics, formatted_result)
+    """
+    from gale_shapley import MatchingInstance, run_pipeline, format_results_markdown, format_statistics_markdown
+    
+    # Parse every row once; all stages share the compiled instance
+    instance = MatchingInstance(raw_applicants, raw_universities)
+    
+    if verbose:
+        print("\nRunning Gale-Shapley algorithm...")
+    
+    result = run_pipeline(instance, workers=workers, nodes=nodes, scoring=scoring)
+    
+    if verbose:
+        print("Algorithm completed successfully.")
+        print(f"Created {len(result.gs_applicants)} applicant objects and {len(result.university_quotas)} university quota objects.")
+        
+        # Print sample of applicant preferences
+        print("\nSample Applicant Preferences:")
+        for i, (app_id, applicant) in enumerate(result.gs_applicants.items()):
+            print(f"{app_id}: {applicant.preferences}")
+            if i >= 2:  # Show just a few examples
+                print("...")
+                break
+        
+        # Print sample of university quota rankings
+        print("\nSample University Quota Rankings:")
+        for i, (quota_id, quota) in enumerate(result.university_quotas.items()):
+            print(f"{quota_id} (Quota: {quota.quota}): {quota.preferences[:5]}...")
+            if i >= 2:  # Show just a few examples
+                print("...")
+                break
+    
+    # Format results
+    formatted_result = format_results_markdown(
+        result.matching, result.gs_applicants, result.university_quotas, result.instance, result.instance.registry
+    )
+    formatted_result += "\n" + format_statistics_markdown(result.statistics)
+    
+    return result.matching, result.cutoffs, result.statistics, formatted_result
 
 def main():
     """
@@ -22,8 +69,34 @@ def main():
                         help='Path to universities CSV file')
     parser.add_argument('--output', type=str, default='data/output/results.md',
                         help='Path to output markdown file')
+    parser.add_argument('--stats-json', type=str, default=None,
+                        help='Path to write the matching statistics as JSON')
+    parser.add_argument('--skip-validation', action='store_true',
+                        help='Load the inputs without the preflight validation pass')
+    parser.add_argument('--max-errors', type=int, default=100,
+                        help='Stop the preflight validation after this many errors')
     parser.add_argument('--verbose', action='store_true',
                         help='Enable verbose output')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Use the round-synchronous engine with this many worker processes')
+    parser.add_argument('--nodes', type=str, default=None,
+                        help='Comma-separated host:port list of matching workers for the distributed engine')
+    parser.add_argument('--scoring', type=str, default=None,
+                        help='Path to a JSON file with per-quota scoring formulas')
+    parser.add_argument('--cache-dir', type=str, default='data/cache',
+                        help='Directory for cached results of identical runs')
+    parser.add_argument('--cache-size', type=int, default=256,
+                        help='Maximum size of the result cache in MB')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always run the matching and do not touch the cache')
+    parser.add_argument('--serve', action='store_true',
+                        help='Keep the instance loaded and serve match, preview and cut-off requests')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Host to bind when serving')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='Port to bind when serving')
+    parser.add_argument('--socket', type=str, default=None,
+                        help='Unix socket path to serve on instead of a TCP port')
     
     args = parser.parse_args()
     
@@ -34,50 +107,79 @@ def main():
     if args.verbose:
         print(f"Loading data from {args.applicants} and {args.universities}...")
     
-    raw_applicants, raw_universities = load_data(args.applicants, args.universities)
+    if args.skip_validation:
+        from gale_shapley import load_data
+        raw_applicants, raw_universities = load_data(args.applicants, args.universities)
+    else:
+        # Reject bad rows before any of the expensive stages run
+        from gale_shapley import preflight
+        checked = preflight(args.applicants, args.universities, sys.stderr, args.max_errors)
+        if checked.errors:
+            print(f"Validation failed with {checked.errors} error(s); nothing was matched.", file=sys.stderr)
+            return 1
+        raw_applicants, raw_universities = checked.raw_applicants, checked.raw_universities
     
     if args.verbose:
         print(f"Loaded {len(raw_applicants)} applicants and {len(raw_universities)} universities.")
     
-    # Create Gale-Shapley entities
-    gs_applicants = create_applicant_preferences(raw_applicants)
-    university_quotas = create_university_quotas(raw_applicants, raw_universities)
-    
-    if args.verbose:
-        print(f"Created {len(gs_applicants)} applicant objects and {len(university_quotas)} university quota objects.")
-        
-        # Print sample of applicant preferences
-        print("\nSample Applicant Preferences:")
-        for i, (app_id, applicant) in enumerate(gs_applicants.items()):
-            print(f"{app_id}: {applicant.preferences}")
-            if i >= 2:  # Show just a few examples
-                print("...")
-                break
-        
-        # Print sample of university quota rankings
-        print("\nSample University Quota Rankings:")
-        for i, (quota_id, quota) in enumerate(university_quotas.items()):
-            print(f"{quota_id} (Quota: {quota.quota}): {quota.preferences[:5]}...")
-            if i >= 2:  # Show just a few examples
-                print("...")
-                break
-    
-    # Run Gale-Shapley algorithm
-    if args.verbose:
-        print("\nRunning Gale-Shapley algorithm...")
-    
-    matching = gale_shapley_matching(gs_applicants, university_quotas)
-    
-    matching = handle_guaranteed_students(matching, raw_applicants, gs_applicants, university_quotas)
-    
-    if args.verbose:
-        print("Algorithm completed successfully.")
-    
-    # Format results
-    formatted_result = format_results_markdown(matching, gs_applicants, university_quotas, raw_applicants)
+    # Serve the warm instance instead of running once
+    if args.serve:
+        from gale_shapley import WarmInstance, serve
+        instance = WarmInstance(raw_applicants, raw_universities)
+        print(f"Serving on {args.socket or f'http://{args.host}:{args.port}'}")
+        serve(instance, args.host, args.port, args.socket)
+        return 0
+    
+    nodes = None
+    if args.nodes:
+        nodes = []
+        for address in args.nodes.split(','):
+            host, _, port = address.strip().rpartition(':')
+            nodes.append((host, int(port)))
+    
+    scoring = None
+    if args.scoring:
+        from gale_shapley import load_formulas
+        scoring = load_formulas(args.scoring)
+    
+    # Reuse the result of an identical earlier run if there is one
+    cache = None
+    if not args.no_cache:
+        from gale_shapley import ResultCache, instance_key
+        cache = ResultCache(args.cache_dir, args.cache_size * 1024 * 1024)
+        options = {'handle_guaranteed_students': True}
+        if scoring is not None:
+            options['scoring'] = scoring
+        cache_key = instance_key(raw_applicants, raw_universities, options)
+        entry = cache.get(cache_key)
+    
+    if cache is not None and entry is not None:
+        if args.verbose:
+            print(f"Cache hit for {cache_key[:12]}, skipping the matching.")
+        statistics = entry['statistics']
+        formatted_result = entry['report']
+    else:
+        matching, cutoffs, statistics, formatted_result = run_matching(
+            raw_applicants, raw_universities, args.verbose, args.workers, nodes, scoring
+        )
+        if cache is not None:
+            cache.put(cache_key, {
+                'matching': matching,
+                'cutoffs': cutoffs,
+                'statistics': statistics,
+                'report': formatted_result
+            })
+    
+    if args.verbose and cache is not None:
+        stats = cache.stats()
+        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
     
     # Save results
+    from gale_shapley import save_results
     save_results(formatted_result, args.output)
+    if args.stats_json:
+        from gale_shapley import statistics_json
+        save_results(statistics_json(statistics), args.stats_json)
     
     if args.verbose:
         print(f"\nResults saved to {args.output}")
@@ -88,4 +190,4 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,25 @@
+import random
+from gale_shapley.models import Applicant, UniversityQuota
+
+def random_instance(seed, num_applicants=60, num_quotas=8, unranked_share=0.0):
+    """
+    Build a random instance; the returned function creates fresh entities on each call.
+    """
+    rnd = random.Random(seed)
+    app_ids = [f"A{i}" for i in range(num_applicants)]
+    quota_ids = [f"U{j % 3}_Q{j}" for j in range(num_quotas)]
+    preferences = {app_id: rnd.sample(quota_ids, rnd.randint(0, 5)) for app_id in app_ids}
+    rankings = {}
+    for quota_id in quota_ids:
+        # Some proposers are left out of the ranking, so they propose unranked
+        rankings[quota_id] = [app_id for app_id in app_ids
+                              if quota_id in preferences[app_id] and rnd.random() >= unranked_share]
+        rnd.shuffle(rankings[quota_id])
+    capacities = {quota_id: rnd.randint(0, 6) for quota_id in quota_ids}
+    
+    def build():
+        applicants = {app_id: Applicant(app_id, prefs) for app_id, prefs in preferences.items()}
+        university_quotas = {q: UniversityQuota(q, capacities[q], rankings[q]) for q in quota_ids}
+        return applicants, university_quotas
+    
+    return build
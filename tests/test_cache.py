@@ -0,0 +1,53 @@
+import os
+import json
+import time
+import tempfile
+import unittest
+from gale_shapley.cache import ResultCache, instance_key
+
+class TestInstanceKey(unittest.TestCase):
+    def test_equal_inputs_share_key(self):
+        universities = {'S1': {'Q1_quota': 1}}
+        a = {'A1': {'applicant_id': 'A1', 'S1_priority': '1', 'S1_Q1_points': '30'}}
+        b = {'A1': dict(a['A1'])}
+        reordered = {'A1': {'S1_Q1_points': '30', 'applicant_id': 'A1', 'S1_priority': '1'}}
+        
+        self.assertEqual(instance_key(a, universities), instance_key(b, universities))
+        self.assertEqual(instance_key(a, universities), instance_key(reordered, universities))
+    
+    def test_values_that_change_the_matching_change_key(self):
+        universities = {'S1': {'Q1_quota': 1, 'Q2_quota': 1}}
+        row = {'applicant_id': 'A1', 'S1_Q1_eligible': 'Yes', 'S1_Q2_eligible': 'No'}
+        padded = dict(row, S1_Q1_eligible='Yes ')
+        
+        # "Yes " is not eligible
+        self.assertNotEqual(instance_key({'A1': row}, universities), instance_key({'A1': padded}, universities))
+    
+    def test_options_and_order_change_key(self):
+        universities = {'S1': {'Q1_quota': 1}}
+        rows = {'A1': {'S1_Q1_points': '30'}, 'A2': {'S1_Q1_points': '30'}}
+        swapped = {'A2': rows['A2'], 'A1': rows['A1']}
+        
+        self.assertNotEqual(instance_key(rows, universities), instance_key(swapped, universities))
+        self.assertNotEqual(instance_key(rows, universities), instance_key(rows, universities, {'x': 1}))
+
+class TestResultCache(unittest.TestCase):
+    def test_hit_miss_and_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            entry = {'matching': {'S1_Q1': ['A1']}, 'cutoffs': {'S1_Q1': 30}, 'report': 'x' * 100}
+            cache = ResultCache(tmp, max_bytes=int(2.5 * len(json.dumps(entry))))
+            
+            self.assertIsNone(cache.get('k1'))
+            cache.put('k1', entry)
+            time.sleep(0.01)
+            cache.put('k2', entry)
+            self.assertEqual(cache.get('k1'), entry)  # k1 is now most recently used
+            time.sleep(0.01)
+            
+            cache.put('k3', entry)  # Over the bound, evicts k2
+            self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 1})
+            self.assertFalse(os.path.exists(os.path.join(tmp, 'k2.json')))
+            self.assertEqual(cache.get('k3'), entry)
+
+if __name__ == '__main__':
+    unittest.main()
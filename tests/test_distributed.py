@@ -0,0 +1,64 @@
+import socket
+import unittest
+from gale_shapley.algorithm import gale_shapley_matching
+from gale_shapley.distributed import (
+    MatchingWorker, distributed_gale_shapley_matching, spawn_local_workers, _send, _receive
+)
+from tests.helpers import random_instance
+
+class TestDistributedMatching(unittest.TestCase):
+    def test_worker_routes_messages_to_owners(self):
+        # Worker 0 of 2 owns applicants 0, 2 and quota 0
+        worker = MatchingWorker(0, 2, {0: [[0, 1], [0, 0]], 2: [[1], [3]]}, [1, 1])
+        
+        outbox = worker.step([], [], start=True)
+        self.assertEqual(outbox[0]['proposals'], [[0, 0, 0]])
+        self.assertEqual(outbox[1]['proposals'], [[1, 3, 2]])
+        
+        outbox = worker.step([[0, 0, 0], [0, 2, 5]], [0])
+        self.assertEqual(outbox[1]['proposals'], [[1, 0, 0]])
+        self.assertEqual(outbox[1]['rejections'], [5])
+        self.assertEqual(worker.collect()[0], {0: [0]})
+    
+    def test_equals_sequential(self):
+        for seed in range(5):
+            build = random_instance(seed, unranked_share=0.3 if seed % 2 else 0.0)
+            expected = gale_shapley_matching(*build())
+            
+            for workers in (1, 3):
+                applicants, university_quotas = build()
+                result = distributed_gale_shapley_matching(applicants, university_quotas, workers=workers)
+                
+                self.assertEqual({q: set(s) for q, s in result.items()}, {q: set(s) for q, s in expected.items()})
+                for quota_id, students in result.items():
+                    for student in students:
+                        self.assertEqual(applicants[student].current_match, quota_id)
+    
+    def test_running_workers(self):
+        addresses, processes = spawn_local_workers(2)
+        build = random_instance(7)
+        expected = gale_shapley_matching(*build())
+        
+        result = distributed_gale_shapley_matching(*build(), addresses=addresses)
+        for process in processes:
+            process.join(5)
+        
+        self.assertEqual({q: set(s) for q, s in result.items()}, {q: set(s) for q, s in expected.items()})
+        self.assertFalse(any(process.is_alive() for process in processes))
+    
+    def test_messages_before_init_get_errors(self):
+        addresses, processes = spawn_local_workers(1)
+        
+        with socket.create_connection(addresses[0]) as connection, connection.makefile('rwb') as stream:
+            for kind in ('step', 'collect'):
+                _send(stream, {'type': kind, 'proposals': [], 'rejections': []})
+                reply = _receive(stream)
+                self.assertEqual(reply['type'], 'error')
+                self.assertIn(kind, reply['error'])
+            _send(stream, {'type': 'stop'})
+        
+        processes[0].join(5)
+        self.assertFalse(processes[0].is_alive())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import subprocess
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget for `import gale_shapley`, overridable for slow CI machines
+IMPORT_BUDGET_MS = float(os.environ.get('GALE_SHAPLEY_IMPORT_BUDGET_MS', '50'))
+
+def run_python(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+
+CLI_RUN = """
+import contextlib, io, runpy, sys
+sys.argv = {argv!r}
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        runpy.run_path('main.py', run_name='__main__')
+    except SystemExit:
+        pass
+"""
+
+def cli_code(output_dir, *args):
+    # Run main.py in-process with its output discarded, so sys.modules can be inspected afterwards
+    return CLI_RUN.format(argv=['main.py', *args, '--output', os.path.join(output_dir, 'results.md')])
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_time_budget(self):
+        result = run_python('import gale_shapley', '-X', 'importtime')
+        
+        # Lines look like "import time:  self [us] | cumulative | imported package"
+        cumulative_us = None
+        for line in result.stderr.splitlines():
+            parts = [part.strip() for part in line.split('|')]
+            if len(parts) == 3 and parts[2] == 'gale_shapley':
+                cumulative_us = int(parts[1])
+        
+        self.assertIsNotNone(cumulative_us)
+        self.assertLess(cumulative_us / 1000, IMPORT_BUDGET_MS)
+    
+    def test_package_import_loads_no_submodules(self):
+        result = run_python(
+            'import sys, gale_shapley; '
+            'print(sorted(m for m in sys.modules if m.startswith("gale_shapley.") or m in ("csv", "asyncio", "multiprocessing")))'
+        )
+        
+        self.assertEqual(result.stdout.strip(), '[]')
+    
+    def test_attribute_access_imports_only_its_modules(self):
+        result = run_python(
+            'import sys; from gale_shapley import gale_shapley_matching; '
+            'print(sorted(m for m in sys.modules if m.startswith("gale_shapley.") or m in ("asyncio", "multiprocessing")))'
+        )
+        
+        self.assertEqual(result.stdout.strip(), "['gale_shapley.algorithm', 'gale_shapley.registry']")
+    
+    def test_cli_run_imports_only_what_it_uses(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run_python(
+                cli_code(tmp, '--no-cache', '--skip-validation') +
+                'print(sorted(m for m in sys.modules if m in ("gale_shapley.cache", "gale_shapley.scoring", '
+                '"gale_shapley.validation", "gale_shapley.service", "gale_shapley.parallel", "hashlib", '
+                '"tempfile", "asyncio", "multiprocessing")))'
+            )
+        
+        self.assertEqual(result.stdout.strip(), '[]')
+    
+    def test_cli_import_time_budget(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run_python(cli_code(tmp, '--no-cache', '--skip-validation'), '-X', 'importtime')
+        
+        # Sum the top-level gale_shapley imports; submodules are imported lazily, one by one
+        cumulative_us = 0
+        for line in result.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].startswith(' gale_shapley'):
+                cumulative_us += int(parts[1].strip())
+        
+        self.assertGreater(cumulative_us, 0)
+        self.assertLess(cumulative_us / 1000, IMPORT_BUDGET_MS)
+    
+    def test_public_names_resolve(self):
+        import gale_shapley
+        
+        for name in gale_shapley.__all__:
+            self.assertTrue(hasattr(gale_shapley, name), name)
+        with self.assertRaises(AttributeError):
+            gale_shapley.not_a_name
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import unittest
+from unittest import mock
+from gale_shapley.utils import load_data, create_applicant_preferences, create_university_quotas, handle_guaranteed_students
+from gale_shapley.instance import MatchingInstance, as_instance
+from gale_shapley.pipeline import run_pipeline
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'input')
+
+class TestMatchingInstance(unittest.TestCase):
+    def setUp(self):
+        self.raw_applicants, self.raw_universities = load_data(
+            os.path.join(DATA_DIR, 'applicants.csv'), os.path.join(DATA_DIR, 'universities.csv')
+        )
+        self.instance = MatchingInstance(self.raw_applicants, self.raw_universities)
+    
+    def test_typed_fields(self):
+        a = self.instance.registry.applicant_index['Newton']
+        
+        self.assertEqual(self.instance.capacities, {'S1_Q1': 1, 'S1_Q2': 2, 'S1_Q3': 1, 'S2_Q1': 1, 'S2_Q2': 2})
+        self.assertEqual(self.instance.preferences[a], ['S2_Q1', 'S2_Q2', 'S1_Q2', 'S1_Q3'])
+        self.assertEqual(self.instance.points_of('Newton', 'S2_Q2'), 30)
+        self.assertEqual(self.instance.guarantees[a], ['S2'])
+        
+        # Turing is not qualified for S1, so no S1 quota is eligible or ranked
+        t = self.instance.registry.applicant_index['Turing']
+        quota_index = self.instance.registry.quota_index
+        self.assertEqual(self.instance.eligible[t], {quota_index['S2_Q1'], quota_index['S2_Q2']})
+        self.assertNotIn(quota_index['S1_Q2'], self.instance.points[t])
+    
+    def test_column_order_does_not_change_preferences(self):
+        # Swap the S1_Q1 and S1_Q3 columns in both files
+        swap = {'S1_Q1_eligible': 'S1_Q3_eligible', 'S1_Q3_eligible': 'S1_Q1_eligible'}
+        raw_applicants = {
+            app_id: {swap.get(column, column): row[swap.get(column, column)] for column in row}
+            for app_id, row in self.raw_applicants.items()
+        }
+        raw_universities = {univ_id: dict(reversed(quotas.items())) for univ_id, quotas in self.raw_universities.items()}
+        
+        instance = MatchingInstance(raw_applicants, raw_universities)
+        
+        a = self.instance.registry.applicant_index['DaVinci']
+        self.assertEqual(instance.preferences[a], ['S2_Q1', 'S2_Q2', 'S1_Q1', 'S1_Q2', 'S1_Q3'])
+        self.assertEqual(instance.preferences, self.instance.preferences)
+        self.assertEqual(run_pipeline(instance).matching, run_pipeline(self.instance).matching)
+    
+    def test_raw_stages_share_one_compile(self):
+        create_applicant_preferences(self.raw_applicants)
+        create_university_quotas(self.raw_applicants, self.raw_universities)
+        
+        instance = as_instance(self.raw_applicants)
+        self.assertIs(as_instance(self.raw_applicants, self.raw_universities), instance)
+        self.assertEqual(instance.capacities, self.instance.capacities)
+        
+        # A replaced row, or other university data, compiles a new instance
+        self.raw_applicants['Turing'] = dict(self.raw_applicants['Turing'], **{'S1_Kvalifisert?': 'Ja'})
+        updated = as_instance(self.raw_applicants, self.raw_universities)
+        self.assertIsNot(updated, instance)
+        self.assertEqual(updated.preferences[updated.registry.applicant_index['Turing']],
+                         ['S1_Q2', 'S1_Q3', 'S2_Q1', 'S2_Q2'])
+        self.assertIsNot(as_instance(self.raw_applicants, dict(self.raw_universities)), updated)
+    
+    def test_guarantee_stage_without_guarantees_does_not_compile(self):
+        raw_applicants = {app_id: dict(row, S2_guaranteed='No') for app_id, row in self.raw_applicants.items()}
+        matching = {'S2_Q2': ['Curie']}
+        
+        with mock.patch('gale_shapley.utils.as_instance') as compile_instance:
+            result = handle_guaranteed_students(matching, raw_applicants, {}, {})
+        
+        self.assertIs(result, matching)
+        compile_instance.assert_not_called()
+    
+    def test_copy_isolates_row_updates(self):
+        other = self.instance.copy()
+        row = dict(self.raw_applicants['Turing'], **{'S1_Kvalifisert?': 'Ja'})
+        other.set_row('Turing', row)
+        other.set_row('Hopper', dict(row, applicant_id='Hopper'))
+        
+        t = self.instance.registry.applicant_index['Turing']
+        self.assertEqual(self.instance.preferences[t], ['S2_Q1', 'S2_Q2'])
+        self.assertEqual(other.preferences[t], ['S1_Q2', 'S1_Q3', 'S2_Q1', 'S2_Q2'])
+        self.assertEqual(len(self.instance), 10)
+        self.assertEqual(len(other), 11)
+    
+    def test_pipeline_accepts_instance_or_raw_data(self):
+        from_instance = run_pipeline(self.instance)
+        from_raw = run_pipeline(self.raw_applicants, self.raw_universities)
+        
+        self.assertEqual(from_instance.matching, from_raw.matching)
+        self.assertEqual(from_instance.cutoffs['S1_Q3'], 55)
+        self.assertIn('Newton', from_instance.matching['S2_Q2'])  # Placed by guarantee
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import csv
+import random
+import tempfile
+import unittest
+from gale_shapley.utils import load_data, create_applicant_preferences, create_university_quotas
+from gale_shapley.algorithm import gale_shapley_matching
+from gale_shapley.outofcore import build_store, outofcore_matching
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'input')
+
+def in_memory_matching(applicants_file, universities_file):
+    raw_applicants, raw_universities = load_data(applicants_file, universities_file)
+    gs_applicants = create_applicant_preferences(raw_applicants)
+    university_quotas = create_university_quotas(raw_applicants, raw_universities)
+    matching = gale_shapley_matching(gs_applicants, university_quotas)
+    return {quota_id: set(students) for quota_id, students in matching.items()}
+
+class TestOutOfCoreMatching(unittest.TestCase):
+    def assertSameMatching(self, applicants_file, universities_file, memory_budget, expected=None):
+        with tempfile.TemporaryDirectory() as tmp:
+            build_store(applicants_file, universities_file, tmp)
+            result = outofcore_matching(tmp, memory_budget)
+        
+        if expected is None:
+            expected = in_memory_matching(applicants_file, universities_file)
+        self.assertEqual({quota_id: set(students) for quota_id, students in result.items()}, expected)
+    
+    def test_sample_data(self):
+        self.assertSameMatching(os.path.join(DATA_DIR, 'applicants.csv'),
+                                os.path.join(DATA_DIR, 'universities.csv'), 1024 * 1024)
+    
+    def write_random_instance(self, directory, seed, ranked_quotas, reverse_columns=False):
+        rnd = random.Random(seed)
+        applicants_file = os.path.join(directory, 'applicants.csv')
+        universities_file = os.path.join(directory, 'universities.csv')
+        order = reversed if reverse_columns else list
+        
+        with open(universities_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['university_id', *order(['Q1_quota', 'Q2_quota', 'Q3_quota'])])
+            writer.writerow(['S1', *order([40, 30, 20])])
+            writer.writerow(['S2', *order([50, 25, 0])])
+        
+        quotas = ['S1_Q1', 'S1_Q2', 'S1_Q3', 'S2_Q1', 'S2_Q2']
+        columns = ['applicant_id', 'S1_priority', 'S2_priority', 'S1_Kvalifisert?', 'S2_Kvalifisert?']
+        columns += [f"{quota}_eligible" for quota in order(quotas)] + [f"{quota}_points" for quota in ranked_quotas]
+        
+        with open(applicants_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for i in range(3000):
+                s1_priority = rnd.choice([1, 2])
+                row = {
+                    'applicant_id': f"A{i}",
+                    'S1_priority': s1_priority,
+                    'S2_priority': 3 - s1_priority,
+                    'S1_Kvalifisert?': rnd.choice(['Ja', 'Ja', 'Nei']),
+                    'S2_Kvalifisert?': rnd.choice(['Ja', 'Ja', 'Nei'])
+                }
+                for quota in quotas:
+                    row[f"{quota}_eligible"] = rnd.choice(['Yes', 'No'])
+                for quota in ranked_quotas:
+                    row[f"{quota}_points"] = rnd.randint(0, 20)  # Many ties
+                writer.writerow(row)
+        
+        return applicants_file, universities_file
+    
+    def test_random_instance_with_small_batches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = self.write_random_instance(tmp, 3, ['S1_Q1', 'S1_Q2', 'S1_Q3', 'S2_Q1', 'S2_Q2'])
+            
+            # A tiny budget forces the minimum batch size
+            self.assertSameMatching(*files, 0)
+    
+    def test_unranked_applicants(self):
+        # Without points columns, eligible applicants propose to quotas that do not rank them
+        with tempfile.TemporaryDirectory() as tmp:
+            files = self.write_random_instance(tmp, 4, ['S1_Q1', 'S2_Q1'])
+            
+            self.assertSameMatching(*files, 0)
+    
+    def test_column_order_does_not_change_the_matching(self):
+        quotas = ['S1_Q1', 'S1_Q2', 'S1_Q3', 'S2_Q1', 'S2_Q2']
+        with tempfile.TemporaryDirectory() as tmp:
+            expected = in_memory_matching(*self.write_random_instance(tmp, 5, quotas))
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            files = self.write_random_instance(tmp, 5, quotas, reverse_columns=True)
+            
+            self.assertEqual(in_memory_matching(*files), expected)
+            self.assertSameMatching(*files, 1024 * 1024, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from gale_shapley.models import Applicant, UniversityQuota
+from gale_shapley.algorithm import gale_shapley_matching
+from gale_shapley.parallel import parallel_gale_shapley_matching, resolve_proposals
+from tests.helpers import random_instance
+
+class TestParallelMatching(unittest.TestCase):
+    def test_resolve_keeps_best_ranked(self):
+        holders = {0: [(1, 10), (4, 11)]}
+        
+        rejected = resolve_proposals([(0, 3, 12), (0, 0, 13), (1, 5, 14)], holders, [2, 1])
+        
+        self.assertEqual(holders, {0: [(0, 13), (1, 10)], 1: [(5, 14)]})
+        self.assertEqual(sorted(rejected), [11, 12])
+    
+    def test_unranked_ties_match_sequential(self):
+        def build():
+            applicants = {'A1': Applicant('A1', ['X', 'Y']), 'A2': Applicant('A2', ['Y']), 'A3': Applicant('A3', ['X'])}
+            university_quotas = {'X': UniversityQuota('X', 1, ['A3', 'A1']), 'Y': UniversityQuota('Y', 1, [])}
+            return applicants, university_quotas
+        
+        expected = gale_shapley_matching(*build())
+        
+        self.assertEqual(expected, {'X': ['A3'], 'Y': ['A1']})
+        for workers in (1, 2):
+            self.assertEqual(parallel_gale_shapley_matching(*build(), workers=workers), expected)
+    
+    def test_equals_sequential(self):
+        for seed in range(20):
+            build = random_instance(seed, unranked_share=0.3 if seed % 2 else 0.0)
+            expected = gale_shapley_matching(*build())
+            
+            for workers in (1, 3):
+                applicants, university_quotas = build()
+                result = parallel_gale_shapley_matching(applicants, university_quotas, workers=workers)
+                
+                self.assertEqual({q: set(s) for q, s in result.items()}, {q: set(s) for q, s in expected.items()})
+                for quota_id, students in result.items():
+                    for student in students:
+                        self.assertEqual(applicants[student].current_match, quota_id)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from gale_shapley.models import Applicant, UniversityQuota
+from gale_shapley.registry import IdRegistry
+from gale_shapley.instance import MatchingInstance
+from gale_shapley.pipeline import run_pipeline
+from gale_shapley.formatters import format_results_markdown
+
+def make_row(app_id, points, guaranteed='No'):
+    return {
+        'applicant_id': app_id, 'S1_priority': '1', 'S1_Kvalifisert?': 'Ja',
+        'S1_Q1_eligible': 'Yes', 'S1_Q1_points': str(points), 'S1_guaranteed': guaranteed
+    }
+
+class TestIdRegistry(unittest.TestCase):
+    def test_dense_indexes(self):
+        registry = IdRegistry()
+        
+        self.assertEqual(registry.add_applicant('A1'), 0)
+        self.assertEqual(registry.add_applicant('A2'), 1)
+        self.assertEqual(registry.add_applicant('A1'), 0)  # Registering again keeps the index
+        self.assertEqual(registry.applicants, ['A1', 'A2'])
+    
+    def test_quota_parent_lookup(self):
+        applicants = {'A1': Applicant('A1', ['S2_Q1', 'S1_Extra_Q'])}
+        university_quotas = {
+            'S1_Q1': UniversityQuota('S1_Q1', 1, ['A1']),
+            'S2_Q1': UniversityQuota('S2_Q1', 1, ['A1'])
+        }
+        
+        registry = IdRegistry.from_entities(applicants, university_quotas)
+        
+        self.assertEqual(registry.quotas, ['S1_Q1', 'S2_Q1', 'S1_Extra_Q'])
+        self.assertEqual(registry.quota_university, [0, 1, 0])
+        self.assertEqual(registry.university_of('S2_Q1'), 'S2')
+        self.assertEqual(registry.quota_name_of('S1_Extra_Q'), 'Extra_Q')
+    
+    def test_integer_stages_leave_registry_unchanged(self):
+        raw_applicants = {
+            'A1': make_row('A1', 50),
+            'A2': make_row('A2', 40),
+            'A3': make_row('A3', 10, guaranteed='Yes')
+        }
+        instance = MatchingInstance(raw_applicants, {'S1': {'Q1_quota': 2}})
+        registry = instance.registry
+        quotas = list(registry.quotas)
+        
+        result = run_pipeline(instance)
+        format_results_markdown(result.matching, result.gs_applicants, result.university_quotas,
+                                instance, registry)
+        
+        # The guarantee displaces the lowest ranked holder
+        self.assertEqual(result.matching, {'S1_Q1': ['A1', 'A3']})
+        self.assertEqual(result.cutoffs, {'S1_Q1': 10})
+        self.assertEqual(registry.quotas, quotas)
+
+if __name__ == '__main__':
+    unittest.main()
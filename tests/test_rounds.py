@@ -0,0 +1,101 @@
+import random
+import unittest
+from gale_shapley.models import Applicant, UniversityQuota
+from gale_shapley.algorithm import gale_shapley_matching
+from gale_shapley.rounds import AdmissionRounds
+
+def is_stable(matching, preferences, rankings, capacities, active):
+    """
+    Check that no active applicant and quota would both rather be matched to each other.
+    """
+    assignment = {student: quota_id for quota_id, students in matching.items() for student in students}
+    for app_id in active:
+        for quota_id in preferences[app_id]:
+            if quota_id == assignment.get(app_id):
+                break
+            ranking = [student for student in rankings[quota_id] if student in active]
+            if app_id not in ranking:
+                continue
+            holders = matching[quota_id]
+            if len(holders) < capacities[quota_id]:
+                return False
+            if any(ranking.index(holder) > ranking.index(app_id) for holder in holders):
+                return False
+    return True
+
+class TestAdmissionRounds(unittest.TestCase):
+    def setUp(self):
+        self.applicants = {
+            'A1': Applicant('A1', ['U1_Q1', 'U2_Q1']),
+            'A2': Applicant('A2', ['U1_Q1', 'U2_Q1']),
+            'A3': Applicant('A3', ['U1_Q1', 'U2_Q1']),
+            'A4': Applicant('A4', ['U2_Q1'])
+        }
+        self.university_quotas = {
+            'U1_Q1': UniversityQuota('U1_Q1', 1, ['A1', 'A2', 'A3']),
+            'U2_Q1': UniversityQuota('U2_Q1', 1, ['A2', 'A3', 'A4'])
+        }
+        matching = gale_shapley_matching(self.applicants, self.university_quotas)
+        self.rounds = AdmissionRounds(matching, self.applicants, self.university_quotas)
+    
+    def test_decline_promotes_along_waitlist(self):
+        self.assertEqual(self.rounds.matching(), {'U1_Q1': ['A1'], 'U2_Q1': ['A2']})
+        self.assertEqual(self.rounds.waitlist('U1_Q1'), ['A2', 'A3'])
+        
+        # A2 moves up to U1_Q1 and frees U2_Q1 for A3
+        promotions = self.rounds.apply_round(declines=['A1'])
+        
+        self.assertEqual(promotions, [('A2', 'U2_Q1', 'U1_Q1'), ('A3', None, 'U2_Q1')])
+        self.assertEqual(self.rounds.matching(), {'U1_Q1': ['A2'], 'U2_Q1': ['A3']})
+        self.assertEqual(self.rounds.waitlist('U2_Q1'), ['A4'])
+    
+    def test_accepted_applicants_are_not_promoted(self):
+        self.rounds.apply_round(accepts=['A2'])
+        promotions = self.rounds.apply_round(declines=['A1'])
+        
+        self.assertEqual(promotions, [('A3', None, 'U1_Q1')])
+        self.assertEqual(self.rounds.matching(), {'U1_Q1': ['A3'], 'U2_Q1': ['A2']})
+        
+        with self.assertRaises(ValueError):
+            self.rounds.apply_round(accepts=['A4'])
+    
+    def test_failed_round_changes_nothing(self):
+        before = self.rounds.matching()
+        
+        with self.assertRaises(ValueError):
+            self.rounds.apply_round(declines=['A1', 'typo'])
+        with self.assertRaises(ValueError):
+            self.rounds.apply_round(accepts=['A2', 'nobody'])
+        
+        self.assertEqual(self.rounds.matching(), before)
+        self.assertEqual(self.rounds.round_number, 0)
+        
+        # A1's seat was never freed, so the valid round still promotes along the waitlist
+        promotions = self.rounds.apply_round(declines=['A1'])
+        self.assertEqual(promotions, [('A2', 'U2_Q1', 'U1_Q1'), ('A3', None, 'U2_Q1')])
+    
+    def test_rounds_stay_stable(self):
+        rnd = random.Random(7)
+        for _ in range(50):
+            app_ids = [f"A{i}" for i in range(30)]
+            quota_ids = [f"U{j % 3}_Q{j}" for j in range(6)]
+            preferences = {app_id: rnd.sample(quota_ids, rnd.randint(0, 4)) for app_id in app_ids}
+            rankings = {}
+            for quota_id in quota_ids:
+                rankings[quota_id] = [app_id for app_id in app_ids if quota_id in preferences[app_id]]
+                rnd.shuffle(rankings[quota_id])
+            capacities = {quota_id: rnd.randint(1, 4) for quota_id in quota_ids}
+            
+            applicants = {app_id: Applicant(app_id, prefs) for app_id, prefs in preferences.items()}
+            university_quotas = {q: UniversityQuota(q, capacities[q], rankings[q]) for q in quota_ids}
+            rounds = AdmissionRounds(gale_shapley_matching(applicants, university_quotas), applicants, university_quotas)
+            
+            active = set(app_ids)
+            for _ in range(3):
+                declines = [app_id for app_id in sorted(active) if rnd.random() < 0.2]
+                active -= set(declines)
+                rounds.apply_round(declines=declines)
+                self.assertTrue(is_stable(rounds.matching(), preferences, rankings, capacities, active))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import unittest
+from gale_shapley.utils import load_data
+from gale_shapley.instance import MatchingInstance
+from gale_shapley.pipeline import run_pipeline
+from gale_shapley.scoring import ScoringEngine
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'input')
+
+def make_row(app_id, points, grades, age_points=''):
+    return {
+        'applicant_id': app_id,
+        'S1_priority': '1', 'S1_Kvalifisert?': 'Ja',
+        'S1_Q1_eligible': 'Yes', 'S1_Q1_points': str(points),
+        'S1_Q2_eligible': 'Yes', 'S1_Q2_points': str(points),
+        'grades': str(grades), 'age_points': age_points
+    }
+
+class TestScoringEngine(unittest.TestCase):
+    def setUp(self):
+        self.raw_applicants = {
+            'A1': make_row('A1', 50, 1),
+            'A2': make_row('A2', 40, 4, '2'),
+            'A3': make_row('A3', 30, 9, '1')
+        }
+        self.raw_universities = {'S1': {'Q1_quota': 1, 'Q2_quota': 1}}
+        self.instance = MatchingInstance(self.raw_applicants, self.raw_universities)
+    
+    def test_default_formula_matches_points(self):
+        raw_applicants, raw_universities = load_data(
+            os.path.join(DATA_DIR, 'applicants.csv'), os.path.join(DATA_DIR, 'universities.csv')
+        )
+        instance = MatchingInstance(raw_applicants, raw_universities)
+        expected = {q: uq.preferences for q, uq in instance.university_quotas().items()}
+        
+        engine = ScoringEngine(instance)
+        
+        self.assertEqual({q: uq.preferences for q, uq in engine.university_quotas().items()}, expected)
+    
+    def test_weighted_formula(self):
+        engine = ScoringEngine(self.instance, {'S1_Q1': {'{quota}_points': 1, 'grades': 5}})
+        
+        self.assertEqual(engine.rankings['S1_Q1'], ['A3', 'A2', 'A1'])
+        self.assertEqual(engine.rankings['S1_Q2'], ['A1', 'A2', 'A3'])
+        self.assertEqual(engine.instance.points_of('A3', 'S1_Q1'), 75)
+        
+        # Applicants missing a term are not ranked, nor eligible for the quota
+        engine.set_formula('S1_Q1', {'grades': 1, 'age_points': 1.0})
+        q = engine.instance.registry.quota_index['S1_Q1']
+        self.assertEqual(engine.rankings['S1_Q1'], ['A3', 'A2'])
+        self.assertNotIn(q, engine.instance.points[0])
+        self.assertNotIn(q, engine.instance.eligible[0])
+        self.assertEqual(engine.instance.preferences[0], ['S1_Q2'])
+        
+        # Scoring them again restores the quota
+        engine.set_formula('S1_Q1', {'grades': 1})
+        self.assertEqual(engine.rankings['S1_Q1'], ['A3', 'A2', 'A1'])
+        self.assertEqual(engine.instance.preferences[0], ['S1_Q1', 'S1_Q2'])
+    
+    def test_scoring_leaves_the_instance_unchanged(self):
+        ScoringEngine(self.instance, {'default': {'grades': 1, 'age_points': 1}})
+        engine = ScoringEngine(self.instance, {'S1_Q1': {'{quota}_points': 2}})
+        
+        self.assertEqual(self.instance.points_of('A3', 'S1_Q1'), 30)
+        self.assertEqual(self.instance.preferences[0], ['S1_Q1', 'S1_Q2'])
+        self.assertEqual(engine.instance.points_of('A3', 'S1_Q1'), 60)
+        self.assertEqual(engine.instance.points_of('A1', 'S1_Q2'), 50)
+    
+    def test_score_columns_are_shared_and_reused(self):
+        engine = ScoringEngine(self.instance, {'default': {'S1_Q1_points': 1, 'grades': 0}})
+        
+        # Both quotas resolve to the same normalized formula
+        self.assertEqual(len(engine.scores), 1)
+        self.assertEqual(engine.formula_key('S1_Q2'), (('S1_Q1_points', 1),))
+    
+    def test_set_formula_only_touches_that_quota(self):
+        engine = ScoringEngine(self.instance)
+        other_ranking = engine.rankings['S1_Q2']
+        
+        ranking = engine.set_formula('S1_Q1', {'grades': 1})
+        
+        self.assertEqual(ranking, ['A3', 'A2', 'A1'])
+        self.assertIs(engine.rankings['S1_Q2'], other_ranking)
+        self.assertEqual(engine.instance.points_of('A1', 'S1_Q2'), 50)
+    
+    def test_pipeline_uses_scores(self):
+        result = run_pipeline(self.instance, scoring={'S1_Q1': {'grades': 1}})
+        
+        self.assertEqual(result.matching, {'S1_Q1': ['A3'], 'S1_Q2': ['A1']})
+        self.assertEqual(result.cutoffs['S1_Q1'], 9)
+    
+    def test_pipeline_skips_applicants_missing_a_term(self):
+        # Spare capacity: A1, who has no age_points, must not be admitted unranked
+        instance = MatchingInstance(self.raw_applicants, {'S1': {'Q1_quota': 3, 'Q2_quota': 1}})
+        
+        result = run_pipeline(instance, scoring={'S1_Q1': {'grades': 1, 'age_points': 1}})
+        
+        self.assertEqual({q: set(s) for q, s in result.matching.items()}, {'S1_Q1': {'A2', 'A3'}, 'S1_Q2': {'A1'}})
+        self.assertIsNone(result.cutoffs['S1_Q1'])
+        self.assertEqual(result.gs_applicants['A1'].preferences, ['S1_Q2'])
+        self.assertEqual(result.statistics['quotas']['S1_Q1']['points']['min'], 6)
+        self.assertEqual(instance.preferences[0], ['S1_Q1', 'S1_Q2'])
+
+if __name__ == '__main__':
+    unittest.main()
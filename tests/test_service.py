@@ -0,0 +1,179 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+from gale_shapley.utils import load_data
+from gale_shapley.pipeline import run_pipeline
+from gale_shapley.service import WarmInstance, MatchingService, ServiceClient, _Proposals
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'input')
+
+
+def load_sample():
+    return load_data(os.path.join(DATA_DIR, 'applicants.csv'), os.path.join(DATA_DIR, 'universities.csv'))
+
+
+def reference_result(raw_applicants, raw_universities):
+    """
+    Matching and cut-offs of the batch pipeline, with admitted applicants listed best ranked first.
+    """
+    result = run_pipeline(raw_applicants, raw_universities)
+    applicant_index = result.instance.registry.applicant_index
+    matching = {}
+    for quota_id, students in result.matching.items():
+        ranks = {app_id: rank for rank, app_id in enumerate(result.university_quotas[quota_id].preferences)}
+        matching[quota_id] = sorted(students, key=lambda app_id: ranks.get(app_id, len(ranks) + applicant_index[app_id]))
+    return matching, result.cutoffs
+
+
+def random_fields(rnd):
+    """
+    Random values for the columns of one applicant, with many equal points.
+    """
+    fields = {}
+    s1_priority = rnd.choice([1, 2])
+    for univ_id, quotas, priority in (('S1', ['Q1', 'Q2', 'Q3'], s1_priority), ('S2', ['Q1', 'Q2'], 3 - s1_priority)):
+        fields[f"{univ_id}_priority"] = priority
+        fields[f"{univ_id}_Kvalifisert?"] = rnd.choice(['Ja', 'Ja', 'Ja', 'Nei'])
+        fields[f"{univ_id}_guaranteed"] = 'Yes' if rnd.random() < 0.05 else 'No'
+        for quota in quotas:
+            fields[f"{univ_id}_{quota}_eligible"] = rnd.choice(['Yes', 'Yes', 'No'])
+            fields[f"{univ_id}_{quota}_points"] = rnd.randint(0, 30)
+    return fields
+
+
+def random_update(rnd, raw_applicants):
+    """
+    Change one to three applicants: a single column of an existing row, or a whole new applicant.
+    """
+    updates = {}
+    for _ in range(rnd.randint(1, 3)):
+        if rnd.random() < 0.2:
+            updates[f"N{len(raw_applicants) + len(updates)}"] = random_fields(rnd)
+            continue
+        app_id = rnd.choice(list(raw_applicants))
+        column, value = rnd.choice(list(random_fields(rnd).items()))
+        updates.setdefault(app_id, {})[column] = value
+    return updates
+
+
+def apply_updates(raw_applicants, updates):
+    for app_id, fields in updates.items():
+        row = dict(raw_applicants.get(app_id, {'applicant_id': app_id}))
+        row.update({key: str(value) for key, value in fields.items()})
+        raw_applicants[app_id] = row
+
+
+class TestWarmInstance(unittest.TestCase):
+    def test_match_equals_pipeline(self):
+        raw_applicants, raw_universities = load_sample()
+        instance = WarmInstance(raw_applicants, raw_universities)
+        
+        self.assertEqual(instance.match(), reference_result(raw_applicants, raw_universities))
+    
+    def test_preview_does_not_commit(self):
+        raw_applicants, raw_universities = load_sample()
+        instance = WarmInstance(raw_applicants, raw_universities)
+        before = instance.match()
+        
+        # Curie gets enough points to win the S1 Q3 seat; Bell's update touches the same ranking
+        matching, _ = instance.preview({'Curie': {'S1_Q3_points': 99}, 'Bell': {'S1_Q3_points': 98}})
+        self.assertEqual(matching['S1_Q3'], ['Curie'])
+        
+        self.assertEqual(instance.match(), before)
+        self.assertEqual(instance.match(), reference_result(raw_applicants, raw_universities))
+        self.assertEqual(instance.instance.points_of('Curie', 'S1_Q3'), int(raw_applicants['Curie']['S1_Q3_points']))
+        self.assertEqual(instance.version, 0)
+    
+    def test_update_matches_full_rebuild(self):
+        raw_applicants, raw_universities = load_sample()
+        instance = WarmInstance(raw_applicants, raw_universities)
+        updates = {
+            'Curie': {'S1_Q3_points': 99},
+            'Jobs': {'S1_Kvalifisert?': 'Ja'},
+            'Hopper': {
+                'S1_priority': 2, 'S2_priority': 1, 'S1_Kvalifisert?': 'Nei', 'S2_Kvalifisert?': 'Ja',
+                'S2_Q1_eligible': 'Yes', 'S2_Q1_points': 60, 'S2_Q2_eligible': 'No'
+            }
+        }
+        
+        self.assertEqual(instance.update(updates), 1)
+        apply_updates(raw_applicants, updates)
+        
+        self.assertEqual(instance.match(), reference_result(raw_applicants, raw_universities))
+    
+    def test_random_updates_match_full_rebuild(self):
+        raw_universities = {'S1': {'Q1_quota': 12, 'Q2_quota': 8, 'Q3_quota': 5}, 'S2': {'Q1_quota': 10, 'Q2_quota': 6}}
+        for seed in range(5):
+            rnd = random.Random(seed)
+            raw_applicants = {}
+            apply_updates(raw_applicants, {f"A{i}": random_fields(rnd) for i in range(120)})
+            instance = WarmInstance(raw_applicants, raw_universities)
+            instance.match()
+            
+            for step in range(30):
+                updates = random_update(rnd, raw_applicants)
+                expected = dict(raw_applicants)
+                apply_updates(expected, updates)
+                
+                with self.subTest(seed=seed, step=step, updates=updates):
+                    self.assertEqual(instance.preview(updates), reference_result(expected, raw_universities))
+                    if step % 3 == 0:
+                        instance.update(updates)
+                        raw_applicants = expected
+                        self.assertEqual(instance.match(), reference_result(raw_applicants, raw_universities))
+    
+    def test_new_applicant_continues_from_the_current_matching(self):
+        raw_applicants, raw_universities = load_sample()
+        instance = WarmInstance(raw_applicants, raw_universities)
+        instance.match()
+        updates = {'Lovelace': {'S1_priority': 1, 'S2_priority': 2, 'S1_Kvalifisert?': 'Ja',
+                                'S1_Q1_eligible': 'Yes', 'S1_Q1_points': 99}}
+        
+        # Nobody has to propose again except the new applicant and whoever it displaces
+        with mock.patch.object(_Proposals, 'empty', side_effect=AssertionError('full rerun')):
+            instance.update(updates)
+            matching, cutoffs = instance.match()
+        
+        apply_updates(raw_applicants, updates)
+        self.assertEqual((matching, cutoffs), reference_result(raw_applicants, raw_universities))
+        self.assertEqual(matching['S1_Q1'], ['Lovelace'])
+
+
+class TestMatchingService(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_over_unix_socket(self):
+        raw_applicants, raw_universities = load_sample()
+        instance = WarmInstance(raw_applicants, raw_universities)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'service.sock')
+            server = await MatchingService(instance).start(path=path)
+            client = await ServiceClient.connect(path=path)
+            try:
+                status, payload = await client.request('GET', '/match')
+                self.assertEqual(status, 200)
+                self.assertEqual(payload['matching'], instance.match()[0])
+                
+                status, payload = await client.request('POST', '/preview', {'applicants': {'Curie': {'S1_Q3_points': 99}}})
+                self.assertEqual(status, 200)
+                self.assertEqual(payload['placements'], {'Curie': 'S1_Q3'})
+                
+                status, payload = await client.request('POST', '/update', {'applicants': {'Curie': {'S1_Q3_points': 99}}})
+                self.assertEqual(payload['version'], 1)
+                
+                status, payload = await client.request('GET', '/cutoffs')
+                self.assertEqual(payload['cutoffs']['S1_Q3'], 99)
+                
+                status, payload = await client.request('POST', '/update', {'rows': []})
+                self.assertEqual(status, 400)
+                
+                status, payload = await client.request('GET', '/missing')
+                self.assertEqual(status, 404)
+            finally:
+                await client.close()
+                server.close()
+                await server.wait_closed()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import unittest
+from gale_shapley.statistics import compute_statistics, format_statistics_markdown, statistics_json
+
+def make_row(app_id, s1_points, s2_points, s2_guaranteed='No'):
+    return {
+        'applicant_id': app_id,
+        'S1_priority': '1', 'S2_priority': '2',
+        'S1_Kvalifisert?': 'Ja', 'S2_Kvalifisert?': 'Ja',
+        'S1_Q1_eligible': 'Yes', 'S1_Q1_points': str(s1_points),
+        'S2_Q1_eligible': 'Yes', 'S2_Q1_points': str(s2_points),
+        'S1_guaranteed': 'No', 'S2_guaranteed': s2_guaranteed
+    }
+
+class TestStatistics(unittest.TestCase):
+    def setUp(self):
+        self.raw_applicants = {
+            'A1': make_row('A1', 50, 40),
+            'A2': make_row('A2', 30, 20, s2_guaranteed='Yes'),
+            'A3': make_row('A3', 10, 60),
+            'A4': make_row('A4', 5, 5)
+        }
+        self.matching = {'S1_Q1': ['A1'], 'S2_Q1': ['A3', 'A2']}
+    
+    def test_counters(self):
+        statistics = compute_statistics(self.matching, self.raw_applicants)
+        
+        self.assertEqual(statistics['admitted'], 3)
+        self.assertEqual(statistics['unmatched'], 1)
+        self.assertEqual(statistics['rank_histogram'], [1, 2])
+        self.assertEqual(statistics['first_choice_share'], 0.25)
+        self.assertAlmostEqual(statistics['first_choice_share_of_admitted'], 1 / 3)
+        self.assertEqual(statistics['guaranteed'], 1)
+        
+        s2 = statistics['quotas']['S2_Q1']
+        self.assertEqual(s2['rank_histogram'], [0, 2])
+        self.assertEqual(s2['points'], {'min': 20, 'max': 60, 'mean': 40.0})
+        self.assertEqual(s2['guaranteed'], 1)
+        self.assertEqual(s2['first_choice_share_of_admitted'], 0.0)
+        self.assertEqual(statistics['quotas']['S1_Q1']['first_choice_share_of_admitted'], 1.0)
+    
+    def test_json_and_markdown(self):
+        statistics = compute_statistics(self.matching, self.raw_applicants)
+        
+        self.assertEqual(json.loads(statistics_json(statistics)), statistics)
+        
+        markdown = format_statistics_markdown(statistics)
+        self.assertIn("Admitted to first choice: 1 out of 4 (25%)", markdown)
+        self.assertIn("| S2_Q1 | 2 | 0 | 0% | 1 | 20 | 40.0 | 60 |", markdown)
+        self.assertIn("| All | 1 | 2 |", markdown)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from gale_shapley.utils import load_data
+from gale_shapley.validation import preflight
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'input')
+
+class TestPreflight(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.applicants_file = os.path.join(DATA_DIR, 'applicants.csv')
+        self.universities_file = os.path.join(DATA_DIR, 'universities.csv')
+        with open(self.applicants_file) as f:
+            self.lines = f.read().splitlines()
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+    
+    def write(self, name, lines):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+    
+    def test_valid_input_loads_like_load_data(self):
+        result = preflight(self.applicants_file, self.universities_file)
+        
+        self.assertEqual((result.errors, result.warnings), (0, 0))
+        self.assertEqual((result.raw_applicants, result.raw_universities),
+                         load_data(self.applicants_file, self.universities_file))
+    
+    def test_bad_rows_are_reported(self):
+        lines = list(self.lines)
+        lines[3] = lines[3].replace('Bell,1,', 'Bell,x,')                            # Bad priority
+        lines[9] = lines[9].replace('Ja,No,Yes,Yes,30,20,', 'Ja,No,Yes,Yes,30,,')    # Missing points
+        lines[2] = lines[2].replace(',Ja,No,No,Yes,', ',Ja,No,Maybe,Yes,')           # Bad eligibility
+        lines.append(lines[1])                                                      # Duplicate ID
+        report = io.StringIO()
+        
+        result = preflight(self.write('applicants.csv', lines), self.universities_file, report)
+        
+        self.assertEqual(result.errors, 4)
+        self.assertIsNone(result.raw_applicants)
+        self.assertEqual([(issue.line, issue.column) for issue in result.issues],
+                         [(3, 'S1_Q2_eligible'), (4, 'S1_priority'), (10, 'S1_Q2_points'), (12, 'applicant_id')])
+        self.assertEqual(report.getvalue().count("\n"), 4)
+        self.assertIn("applicants.csv:4: S1_priority:", report.getvalue())
+    
+    def test_unqualified_rows_skip_points_checks(self):
+        # Turing is not qualified for S1, so S1 priority and points are never parsed
+        lines = [line.replace('Turing,1,2,Nei,No,Yes,Yes,40,30,', 'Turing,?,2,Nei,No,Yes,Yes,40,,') for line in self.lines]
+        
+        result = preflight(self.write('applicants.csv', lines), self.universities_file)
+        
+        self.assertEqual(result.errors, 0)
+    
+    def test_missing_points_column_is_an_error(self):
+        # Drop the S2_Q2_points column, which eligible applicants would be ranked by
+        column = self.lines[0].split(',').index('S2_Q2_points')
+        lines = [','.join(value for pos, value in enumerate(line.split(',')) if pos != column) for line in self.lines]
+        
+        result = preflight(self.write('applicants.csv', lines), self.universities_file)
+        
+        self.assertEqual(result.errors, 1)
+        self.assertIsNone(result.raw_applicants)
+        self.assertEqual((result.issues[0].line, result.issues[0].column), (1, 'S2_Q2_points'))
+    
+    def test_guarantees_without_effect_are_warned(self):
+        lines = list(self.lines)
+        # Newton is guaranteed S2 but not qualified for it; Tesla is guaranteed S1 but eligible for no S1 quota
+        lines[10] = lines[10].replace(',30,Ja,Yes,Yes,10,30,No,Yes', ',30,Nei,Yes,Yes,10,30,No,Yes')
+        lines[1] = 'Tesla,1,2,Ja,No,No,No,55,50,55,Ja,No,Yes,50,55,Yes,No'
+        
+        result = preflight(self.write('applicants.csv', lines), self.universities_file)
+        
+        self.assertEqual((result.errors, result.warnings), (0, 2))
+        self.assertIsNotNone(result.raw_applicants)
+        self.assertEqual([(issue.line, issue.column) for issue in result.issues],
+                         [(2, 'S1_guaranteed'), (11, 'S2_guaranteed')])
+        self.assertIn("not eligible for any S1 quota", result.issues[0].message)
+        self.assertIn("not qualified for S2", result.issues[1].message)
+    
+    def test_unknown_university_and_duplicate_university(self):
+        universities = self.write('universities.csv', [
+            'university_id,Q1_quota,Q2_quota,Q3_quota', 'S1,1,2,1', 'S1,1,1,1'
+        ])
+        
+        result = preflight(self.applicants_file, universities)
+        
+        self.assertEqual([issue.message for issue in result.issues], [
+            "duplicate university ID 'S1'",
+            "university 'S2' is not in the universities file"
+        ])
+    
+    def test_max_errors_stops_early(self):
+        lines = [self.lines[0]] + [line.replace(',Ja,', ',Kanskje,') for line in self.lines[1:]]
+        
+        result = preflight(self.write('applicants.csv', lines), self.universities_file, max_errors=3)
+        
+        self.assertEqual(result.errors, 3)
+        self.assertEqual(len(result.issues), 3)
+
+if __name__ == '__main__':
+    unittest.main()